@@ -107,7 +107,9 @@ def run_structure_analysis(config_manager, verbose=False):
             target_selection=config_manager.get_parameter('target_selection'),
             cutoff_distance=config_manager.get_parameter('distance_range'),
             use_trajectory=config_manager.get_parameter('use_trajectory'),
-            occupancy_threshold=config_manager.get_parameter('occupancy_threshold')
+            occupancy_threshold=config_manager.get_parameter('occupancy_threshold'),
+            frame_stride=config_manager.get_parameter('frame_stride', 1),
+            n_workers=config_manager.get_parameter('analysis_workers', 1)
         )
         
         # Print results
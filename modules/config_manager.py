@@ -55,6 +55,8 @@ class ConfigManager:
         'target_selection': 'chain A',  # Target selection: 'chain A' for peptide or 'resname LIG' for ligand
         'use_trajectory': False,   # Whether to use trajectory for selection
         'occupancy_threshold': 0.5, # Threshold for trajectory-based selection
+        'frame_stride': 1,         # Analyze every n-th trajectory frame
+        'analysis_workers': 1,     # Processes for trajectory-based selection
         
         # MD results directory structure
         'md_results_dir': 'example/MD_results',  # Base directory containing MD results
@@ -109,7 +111,8 @@ class ConfigManager:
         
         try:
             if FileUtils:
-                # Use unified file utilities
+                # Use unified file utilities (a private mutable copy: the
+                # merged config is changed by set_parameter and CLI overrides)
                 user_config = FileUtils.load_yaml(config_path)
             else:
                 # Fallback to direct YAML loading
@@ -145,6 +148,8 @@ class ConfigManager:
             'target_selection': 'chain A',
             'use_trajectory': False,
             'occupancy_threshold': 0.5,
+            'frame_stride': 1,
+            'analysis_workers': 1,
             'md_results_dir': 'example/MD_results',
             'output_dir': './rest2_simulation',
             'force_overwrite': False
@@ -194,6 +199,11 @@ class ConfigManager:
             if self.config['occupancy_threshold'] < 0 or self.config['occupancy_threshold'] > 1:
                 errors.append("occupancy_threshold must be between 0 and 1")
             
+            for key in ('frame_stride', 'analysis_workers'):
+                value = self.config[key]
+                if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                    errors.append(f"{key} must be a positive integer")
+            
             if errors:
                 raise ConfigValidationError("\n".join(errors))
     
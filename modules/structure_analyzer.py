@@ -4,15 +4,376 @@ REST2 Structure Analysis Module
 Analyzes molecular structures and trajectories using MDAnalysis
 """
 
+import multiprocessing
+import struct
+from concurrent.futures import ProcessPoolExecutor
 import MDAnalysis as mda
+from MDAnalysis.lib.distances import capped_distance
 import numpy as np
+from scipy.spatial import cKDTree
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional, Union
 import warnings
 
+try:
+    import numba
+except ImportError:
+    # Optional: JIT-compiled contact kernel for large searches
+    numba = None
+
 # Suppress MDAnalysis warnings for cleaner output
 warnings.filterwarnings('ignore', category=UserWarning, module='MDAnalysis')
 
+# Target atoms per neighbor search call; bounds the size of the contact pair buffer
+TARGET_BLOCK_SIZE = 2048
+
+# Atom pair count above which the Numba kernel is used (when available).
+# Loading the compiled kernel costs ~0.3 s even from the disk cache (seconds
+# when compiling), about what capped_distance needs for this many pairs
+NUMBA_PAIR_THRESHOLD = 100_000_000
+
+# Upper bound on cell list grid cells per dimension
+MAX_CELLS_PER_DIM = 128
+
+# Nearby residue searches remembered per analyzer
+NEARBY_CACHE_SIZE = 32
+
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _cell_list_contacts(target_pos, protein_pos, target_resids, protein_resids,
+                            cutoff2, cell_size, out_mask):
+        """
+        Mark protein atoms within cutoff of any target atom of another residue
+        
+        Bins protein atoms into a uniform grid of cells no smaller than the
+        cutoff, so each target atom only visits its 27 neighboring cells.
+        Distances are non-periodic.
+        """
+        n_protein = protein_pos.shape[0]
+        
+        # Grid geometry from the protein bounding box
+        origin = np.empty(3)
+        n_cells_dim = np.empty(3, dtype=np.int64)
+        for d in range(3):
+            lo = protein_pos[0, d]
+            hi = protein_pos[0, d]
+            for j in range(1, n_protein):
+                v = protein_pos[j, d]
+                if v < lo:
+                    lo = v
+                elif v > hi:
+                    hi = v
+            origin[d] = lo
+            n_cells_dim[d] = int((hi - lo) / cell_size) + 1
+        nx, ny, nz = n_cells_dim[0], n_cells_dim[1], n_cells_dim[2]
+        
+        # Counting sort of protein atoms by cell
+        cell_of = np.empty(n_protein, dtype=np.int64)
+        cell_start = np.zeros(nx * ny * nz + 1, dtype=np.int64)
+        for j in range(n_protein):
+            cx = int((protein_pos[j, 0] - origin[0]) / cell_size)
+            cy = int((protein_pos[j, 1] - origin[1]) / cell_size)
+            cz = int((protein_pos[j, 2] - origin[2]) / cell_size)
+            c = (cx * ny + cy) * nz + cz
+            cell_of[j] = c
+            cell_start[c + 1] += 1
+        for c in range(nx * ny * nz):
+            cell_start[c + 1] += cell_start[c]
+        fill = cell_start[:-1].copy()
+        order = np.empty(n_protein, dtype=np.int64)
+        for j in range(n_protein):
+            c = cell_of[j]
+            order[fill[c]] = j
+            fill[c] += 1
+        
+        # Scan neighboring cells of each target atom
+        for i in numba.prange(target_pos.shape[0]):
+            tx = target_pos[i, 0]
+            ty = target_pos[i, 1]
+            tz = target_pos[i, 2]
+            tres = target_resids[i]
+            ix = int(np.floor((tx - origin[0]) / cell_size))
+            iy = int(np.floor((ty - origin[1]) / cell_size))
+            iz = int(np.floor((tz - origin[2]) / cell_size))
+            for cx in range(max(ix - 1, 0), min(ix + 2, nx)):
+                for cy in range(max(iy - 1, 0), min(iy + 2, ny)):
+                    for cz in range(max(iz - 1, 0), min(iz + 2, nz)):
+                        c = (cx * ny + cy) * nz + cz
+                        for k in range(cell_start[c], cell_start[c + 1]):
+                            j = order[k]
+                            if protein_resids[j] == tres:
+                                continue
+                            dx = protein_pos[j, 0] - tx
+                            dy = protein_pos[j, 1] - ty
+                            dz = protein_pos[j, 2] - tz
+                            if dx * dx + dy * dy + dz * dz <= cutoff2:
+                                out_mask[j] = 1
+
+
+def _contact_resids(target_positions: np.ndarray, protein_positions: np.ndarray,
+                    target_resids: np.ndarray, protein_resids: np.ndarray,
+                    cutoff_distance: float, box: Optional[np.ndarray] = None,
+                    shared_resid_mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Find residues with any atom within cutoff of a target atom
+    
+    Protein atoms are first restricted to the target bounding box padded
+    by the cutoff (non-periodic searches only). Non-periodic searches with
+    more than NUMBA_PAIR_THRESHOLD atom pairs go to the Numba cell list
+    kernel when Numba is installed; otherwise uses the MDAnalysis
+    grid-based neighbor search instead of a full distance matrix,
+    processing the target in blocks of TARGET_BLOCK_SIZE atoms. Pairs in
+    which both atoms share a residue ID are ignored.
+    
+    Args:
+        target_positions: Target atom coordinates (N x 3)
+        protein_positions: Protein atom coordinates (M x 3)
+        target_resids: Residue IDs of target atoms
+        protein_resids: Residue IDs of protein atoms
+        cutoff_distance: Cutoff distance in Angstroms
+        box: Unit cell dimensions for periodic distances (None for plain distances)
+        shared_resid_mask: Per protein atom, whether its resid also occurs in
+            the target (computed if not given)
+    
+    Returns:
+        Sorted array of unique residue IDs within cutoff
+    """
+    if len(target_positions) == 0 or len(protein_positions) == 0:
+        return np.empty(0, dtype=protein_resids.dtype)
+    
+    # Drop protein atoms outside the target bounding box padded by the
+    # cutoff (not valid for periodic distances, which may wrap)
+    if box is None:
+        lower = target_positions.min(axis=0) - cutoff_distance
+        upper = target_positions.max(axis=0) + cutoff_distance
+        in_box = ((protein_positions >= lower) & (protein_positions <= upper)).all(axis=1)
+        protein_positions = protein_positions[in_box]
+        protein_resids = protein_resids[in_box]
+        if shared_resid_mask is not None:
+            shared_resid_mask = shared_resid_mask[in_box]
+        if len(protein_positions) == 0:
+            return np.empty(0, dtype=protein_resids.dtype)
+    
+    # Large non-periodic searches: compiled cell list kernel
+    if (numba is not None and box is None
+            and len(target_positions) * len(protein_positions) > NUMBA_PAIR_THRESHOLD):
+        return _contact_resids_numba(
+            target_positions, protein_positions,
+            target_resids, protein_resids, cutoff_distance
+        )
+    
+    if shared_resid_mask is None:
+        shared_resid_mask = np.isin(protein_resids, target_resids)
+    
+    # Search in target blocks so the pair buffer stays cache-sized
+    # even for large targets and cutoffs; hits are OR-ed per protein atom
+    hit_mask = np.zeros(len(protein_positions), dtype=np.uint8)
+    for start in range(0, len(target_positions), TARGET_BLOCK_SIZE):
+        stop = start + TARGET_BLOCK_SIZE
+        pairs = capped_distance(target_positions[start:stop], protein_positions,
+                                max_cutoff=cutoff_distance, box=box,
+                                return_distances=False)
+        if len(pairs) == 0:
+            continue
+    
+        # Skip pairs within the same residue (for peptide targets); only
+        # protein atoms whose resid occurs in the target need the check
+        contact_atoms = pairs[:, 1]
+        check = shared_resid_mask[contact_atoms]
+        keep = ~check
+        if check.any():
+            keep[check] = (target_resids[start:stop][pairs[check, 0]]
+                           != protein_resids[contact_atoms[check]])
+        hit_mask[contact_atoms[keep]] = 1
+    
+    return np.unique(protein_resids[hit_mask.view(bool)])
+
+
+def _contact_resids_numba(target_positions: np.ndarray, protein_positions: np.ndarray,
+                          target_resids: np.ndarray, protein_resids: np.ndarray,
+                          cutoff_distance: float) -> np.ndarray:
+    """
+    Find residues within cutoff of the target with the Numba cell list kernel
+    
+    Args:
+        target_positions: Target atom coordinates (N x 3)
+        protein_positions: Protein atom coordinates (M x 3)
+        target_resids: Residue IDs of target atoms
+        protein_resids: Residue IDs of protein atoms
+        cutoff_distance: Cutoff distance in Angstroms
+    
+    Returns:
+        Sorted array of unique residue IDs within cutoff
+    """
+    # Cells must not be smaller than the cutoff; grow them for small cutoffs
+    extent = float((protein_positions.max(axis=0) - protein_positions.min(axis=0)).max())
+    cell_size = max(cutoff_distance, extent / MAX_CELLS_PER_DIM, 1e-3)
+    
+    hit_mask = np.zeros(len(protein_positions), dtype=np.uint8)
+    _cell_list_contacts(
+        target_positions, protein_positions,
+        np.ascontiguousarray(target_resids, dtype=np.int64),
+        np.ascontiguousarray(protein_resids, dtype=np.int64),
+        cutoff_distance * cutoff_distance, cell_size, hit_mask
+    )
+    return np.unique(protein_resids[hit_mask.view(bool)])
+
+
+def _map_dcd_frames(dcd_file: str, n_atoms: int) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    Memory-map the coordinate blocks of a DCD trajectory
+    
+    Only plain layouts are mapped: no fixed atoms and no 4th dimension
+    (an optional unit cell record is skipped).
+    
+    Args:
+        dcd_file: DCD trajectory file
+        n_atoms: Expected number of atoms per frame
+        
+    Returns:
+        (frames, cell_words) with frames a read-only (n_frames x frame_words)
+        float32 map and cell_words the length of the unit cell record,
+        or None if the file layout is not supported
+    """
+    try:
+        with open(dcd_file, 'rb') as handle:
+            # First record marker is 84 in the file's byte order
+            first = handle.read(4)
+            for endian in '<>':
+                if struct.unpack(endian + 'i', first)[0] == 84:
+                    break
+            else:
+                return None
+            
+            # 'CORD' + 20 control integers + end marker
+            block = handle.read(88)
+            if block[:4] != b'CORD' or struct.unpack(endian + 'i', block[84:])[0] != 84:
+                return None
+            icntrl = struct.unpack(endian + '20i', block[4:84])
+            
+            # Skip title record
+            title_size = struct.unpack(endian + 'i', handle.read(4))[0]
+            handle.seek(title_size + 4, 1)
+            
+            marker, dcd_atoms, end_marker = struct.unpack(endian + '3i', handle.read(12))
+            header_end = handle.tell()
+    except (OSError, struct.error):
+        return None
+    
+    fixed_atoms, has_cell, four_dims, charmm_version = icntrl[8], icntrl[10], icntrl[11], icntrl[19]
+    if marker != 4 or end_marker != 4 or dcd_atoms != n_atoms or fixed_atoms or four_dims:
+        return None
+    
+    # Per frame: [unit cell record] + X, Y, Z records (marker, n floats, marker)
+    cell_words = 14 if (charmm_version and has_cell) else 0
+    frame_words = cell_words + 3 * (n_atoms + 2)
+    n_frames = (Path(dcd_file).stat().st_size - header_end) // (4 * frame_words)
+    if n_frames == 0:
+        return None
+    
+    frames = np.memmap(dcd_file, dtype=endian + 'f4', mode='r', offset=header_end,
+                       shape=(n_frames, frame_words))
+    markers = frames[0].view(endian + 'i4')
+    if markers[cell_words] != 4 * n_atoms or (cell_words and markers[0] != 48):
+        return None
+    
+    return frames, cell_words
+
+
+def _iter_frame_positions(universe: mda.Universe, target_atoms: mda.AtomGroup,
+                          protein_atoms: mda.AtomGroup, pbc: bool, frames: np.ndarray):
+    """
+    Yield (target_positions, protein_positions, box) for each trajectory frame
+    
+    Non-periodic scans of DCD trajectories read coordinates straight from a
+    memory map; other formats go through the MDAnalysis reader.
+    """
+    trajectory = universe.trajectory
+    dcd_file = getattr(trajectory, 'filename', None)
+    dcd = None
+    if not pbc and dcd_file and Path(dcd_file).suffix.lower() == '.dcd':
+        dcd = _map_dcd_frames(dcd_file, universe.atoms.n_atoms)
+        if dcd is not None and len(dcd[0]) != len(trajectory):
+            dcd = None
+    
+    if dcd is None:
+        for ts in trajectory[frames]:
+            # Contiguous float32 coordinates for this frame
+            yield (np.ascontiguousarray(target_atoms.positions, dtype=np.float32),
+                   np.ascontiguousarray(protein_atoms.positions, dtype=np.float32),
+                   ts.dimensions if pbc else None)
+        return
+    
+    dcd_frames, cell_words = dcd
+    n_atoms = universe.atoms.n_atoms
+    target_indices = target_atoms.indices
+    protein_indices = protein_atoms.indices
+    for frame in frames:
+        # (3 x n_atoms) view of the X, Y, Z records without their markers
+        xyz = dcd_frames[frame, cell_words:].reshape(3, n_atoms + 2)[:, 1:-1]
+        yield (np.ascontiguousarray(xyz[:, target_indices].T, dtype=np.float32),
+               np.ascontiguousarray(xyz[:, protein_indices].T, dtype=np.float32),
+               None)
+
+
+def _count_frame_contacts(universe: mda.Universe, target_atoms: mda.AtomGroup,
+                          protein_atoms: mda.AtomGroup, cutoff_distance: float,
+                          pbc: bool, frames: np.ndarray,
+                          slot_resids: np.ndarray) -> np.ndarray:
+    """
+    Count per-residue contact frames over a set of trajectory frames
+    
+    Args:
+        universe: Universe whose trajectory is iterated
+        target_atoms: Target atom group
+        protein_atoms: Protein atom group
+        cutoff_distance: Cutoff distance in Angstroms
+        pbc: Whether to use periodic (minimum image) distances
+        frames: Trajectory frame indices to analyze
+        slot_resids: Sorted distinct protein resids (one counter each)
+        
+    Returns:
+        Number of frames in which each slot resid is in contact
+    """
+    # Selections and residue IDs do not change between frames
+    target_resids = target_atoms.resids
+    protein_resids = protein_atoms.resids
+    shared_resid_mask = np.isin(protein_resids, target_resids)
+    
+    contact_counts = np.zeros(len(slot_resids), dtype=np.int32)
+    
+    for target_pos, protein_pos, box in _iter_frame_positions(
+            universe, target_atoms, protein_atoms, pbc, frames):
+        # Find contacts in this frame
+        frame_contacts = _contact_resids(
+            target_pos, protein_pos,
+            target_resids, protein_resids,
+            cutoff_distance, box, shared_resid_mask
+        )
+        
+        # Update contact counts (frame contacts are unique resids)
+        contact_counts[np.searchsorted(slot_resids, frame_contacts)] += 1
+    
+    return contact_counts
+
+
+def _count_frame_contacts_worker(universe_files: Tuple[str, ...], target_indices: np.ndarray,
+                                 protein_indices: np.ndarray, cutoff_distance: float,
+                                 pbc: bool, frames: np.ndarray,
+                                 slot_resids: np.ndarray) -> np.ndarray:
+    """
+    Process pool entry point: count contacts on a private Universe
+    
+    Each worker opens its own Universe, since open trajectory handles
+    cannot be shared between processes.
+    """
+    universe = mda.Universe(*universe_files)
+    return _count_frame_contacts(
+        universe, universe.atoms[target_indices], universe.atoms[protein_indices],
+        cutoff_distance, pbc, frames, slot_resids
+    )
+
 
 class StructureAnalysisError(Exception):
     """Structure analysis error"""
@@ -42,14 +403,66 @@ class StructureAnalyzer:
         # Validate input files
         self._validate_files()
         
-        # Load universe
-        self.universe = self._load_universe()
+        # Universe is loaded on first access (see the universe property)
+        self._universe = None
+        
+        # Cached protein selection (static AtomGroup, valid for all frames)
+        self._protein_atoms = None
+        
+        # KD-tree of protein coordinates for static searches, and its frame
+        self._protein_tree = None
+        self._protein_tree_frame = None
+        
+        # Per-atom resids (built when the universe is loaded) and the
+        # resid -> residue lookup (built on first use)
+        self._resid_to_residue = None
+        self._atom_resids = None
+        
+        # Nearby residue searches keyed on the request and trajectory state,
+        # oldest first
+        self._nearby_cache: Dict[tuple, Tuple[int, ...]] = {}
         
         # Analysis results
         self.target_atoms = None
         self.nearby_residues = None
         self.solute_atoms = None
         
+    @property
+    def universe(self) -> mda.Universe:
+        """MDAnalysis universe, loaded on first access"""
+        if self._universe is None:
+            self._universe = self._load_universe()
+        return self._universe
+    
+    def _residue_for_resid(self, resid: int):
+        """
+        First residue with the given resid, loading the universe if needed
+        
+        Raises:
+            KeyError: If no residue has this resid
+        """
+        if self._resid_to_residue is None:
+            # Map each resid to its first residue (same as "resid X" selection order)
+            residues = self.universe.residues
+            unique_resids, first_index = np.unique(residues.resids, return_index=True)
+            self._resid_to_residue = {
+                key: residues[index]
+                for key, index in zip(unique_resids.tolist(), first_index.tolist())
+            }
+        return self._resid_to_residue[resid]
+    
+    def close(self) -> None:
+        """Release the loaded universe and its trajectory file handle"""
+        self._nearby_cache.clear()
+        if self._universe is not None:
+            self._universe.trajectory.close()
+            self._universe = None
+            self._protein_atoms = None
+            self._protein_tree = None
+            self._protein_tree_frame = None
+            self._resid_to_residue = None
+            self._atom_resids = None
+    
     def _validate_files(self) -> None:
         """Validate input files exist"""
         if not self.structure_file.exists():
@@ -64,6 +477,8 @@ class StructureAnalyzer:
     def _load_universe(self) -> mda.Universe:
         """Load MDAnalysis universe"""
         try:
+            structure_path = self.structure_file
+            
             # Check if we need to extract PDB with chain information
             if self.topology_file.suffix == '.tpr':
                 # Try to create PDB file with chain information from TPR
@@ -73,19 +488,16 @@ class StructureAnalyzer:
                 
                 # Load PDB file if it exists
                 if pdb_file.exists():
-                    if self.trajectory_file:
-                        universe = mda.Universe(str(pdb_file), str(self.trajectory_file))
-                    else:
-                        universe = mda.Universe(str(pdb_file))
-                    return universe
+                    structure_path = pdb_file
             
-            # Fallback to original method
+            # Structure (+ trajectory) files; worker processes reopen the same files
+            self._universe_files = (str(structure_path),)
             if self.trajectory_file:
-                # Load with trajectory: GRO + XTC
-                universe = mda.Universe(str(self.structure_file), str(self.trajectory_file))
-            else:
-                # Load structure only: GRO file
-                universe = mda.Universe(str(self.structure_file))
+                self._universe_files += (str(self.trajectory_file),)
+            
+            universe = mda.Universe(*self._universe_files)
+            
+            self._atom_resids = np.ascontiguousarray(universe.atoms.resids, dtype=np.int64)
             
             return universe
             
@@ -128,6 +540,50 @@ class StructureAnalyzer:
             print(f"Warning: Could not extract PDB with chains: {e}")
             return
     
+    def _get_protein_atoms(self) -> mda.AtomGroup:
+        """Get protein atoms, parsing the selection only once"""
+        if self._protein_atoms is None:
+            self._protein_atoms = self.universe.select_atoms("protein")
+        return self._protein_atoms
+    
+    def _get_protein_tree(self) -> cKDTree:
+        """Get KD-tree of protein coordinates for the current frame (built once)"""
+        frame = self.universe.trajectory.ts.frame
+        if self._protein_tree is None or self._protein_tree_frame != frame:
+            self._protein_tree = cKDTree(self._get_protein_atoms().positions)
+            self._protein_tree_frame = frame
+        return self._protein_tree
+    
+    def _contact_resids_tree(self, target_positions: np.ndarray, target_resids: np.ndarray,
+                             cutoff_distance: float) -> np.ndarray:
+        """
+        Find residues within cutoff of the target with the persistent protein KD-tree
+        
+        Args:
+            target_positions: Target atom coordinates (N x 3)
+            target_resids: Residue IDs of target atoms
+            cutoff_distance: Cutoff distance in Angstroms
+            
+        Returns:
+            Sorted array of unique residue IDs within cutoff
+        """
+        protein_resids = self._get_protein_atoms().resids
+        neighbor_lists = self._get_protein_tree().query_ball_point(
+            target_positions, r=cutoff_distance
+        )
+        
+        # Flatten per-target neighbor lists into (target, protein) pairs
+        counts = np.fromiter(map(len, neighbor_lists), dtype=np.int64, count=len(neighbor_lists))
+        if counts.sum() == 0:
+            return np.empty(0, dtype=protein_resids.dtype)
+        pair_target = np.repeat(np.arange(len(neighbor_lists)), counts)
+        pair_protein = np.concatenate(neighbor_lists).astype(np.int64)
+        
+        # Skip pairs within the same residue (for peptide targets)
+        contact_resids = protein_resids[pair_protein]
+        different = target_resids[pair_target] != contact_resids
+        return np.unique(contact_resids[different])
+    
     def identify_target_region(self, target_selection: str) -> mda.AtomGroup:
         """
         Identify target atoms based on selection string
@@ -153,49 +609,63 @@ class StructureAnalyzer:
             raise StructureAnalysisError(f"Target identification failed: {e}")
     
     def find_nearby_residues_static(self, target_atoms: mda.AtomGroup, 
-                                  cutoff_distance: float) -> Set[int]:
+                                  cutoff_distance: float, pbc: bool = False) -> Set[int]:
         """
         Find nearby residues using static structure
         
         Args:
             target_atoms: Target atom group
             cutoff_distance: Cutoff distance in Angstroms
+            pbc: Whether to use periodic (minimum image) distances
             
         Returns:
             Set of residue IDs within cutoff
         """
-        nearby_resids = set()
-        
         # Get all protein atoms (excluding target if it's protein)
-        protein_atoms = self.universe.select_atoms("protein")
+        protein_atoms = self._get_protein_atoms()
+        box = self.universe.dimensions if pbc else None
         
-        # Calculate distances from target to all protein atoms
-        for target_atom in target_atoms:
-            target_pos = target_atom.position
-            
-            for protein_atom in protein_atoms:
-                # Skip if same residue (for peptide targets)
-                if (hasattr(target_atom, 'resid') and hasattr(protein_atom, 'resid') 
-                    and target_atom.resid == protein_atom.resid):
-                    continue
-                
-                distance = np.linalg.norm(target_pos - protein_atom.position)
-                
-                if distance <= cutoff_distance:
-                    nearby_resids.add(protein_atom.resid)
+        # Contiguous float32 coordinates; no per-atom attribute access
+        target_pos = np.ascontiguousarray(target_atoms.positions, dtype=np.float32)
         
-        return nearby_resids
+        if not pbc:
+            # Protein coordinates are fixed: reuse one KD-tree across searches
+            # (a one-shot search never amortizes loading the Numba kernel)
+            nearby_resids = self._contact_resids_tree(
+                target_pos, target_atoms.resids, cutoff_distance
+            )
+        else:
+            protein_pos = np.ascontiguousarray(protein_atoms.positions, dtype=np.float32)
+            nearby_resids = _contact_resids(
+                target_pos, protein_pos,
+                target_atoms.resids, protein_atoms.resids,
+                cutoff_distance, box
+            )
+        
+        return set(nearby_resids.tolist())
     
     def find_nearby_residues_trajectory(self, target_atoms: mda.AtomGroup,
                                       cutoff_distance: float, 
-                                      occupancy_threshold: float) -> Set[int]:
+                                      occupancy_threshold: float,
+                                      pbc: bool = False,
+                                      frame_stride: int = 1,
+                                      n_workers: int = 1) -> Set[int]:
         """
         Find nearby residues using trajectory analysis
         
+        A frame_stride above 1 analyzes every n-th frame only. This is
+        appropriate when occupancy_threshold is much larger than
+        1 / total_frames, so the subsampled occupancy still resolves it.
+        With n_workers above 1 the frames are split into contiguous ranges
+        scanned by separate processes.
+        
         Args:
             target_atoms: Target atom group
             cutoff_distance: Cutoff distance in Angstroms
             occupancy_threshold: Minimum occupancy fraction (0-1)
+            pbc: Whether to use periodic (minimum image) distances
+            frame_stride: Analyze every n-th frame
+            n_workers: Number of worker processes scanning frame ranges
             
         Returns:
             Set of residue IDs meeting occupancy threshold
@@ -203,49 +673,52 @@ class StructureAnalyzer:
         if not self.trajectory_file:
             raise StructureAnalysisError("Trajectory file required for dynamic analysis")
         
-        # Dictionary to track residue contact counts
-        residue_contacts = {}
-        total_frames = 0
+        if frame_stride < 1:
+            raise StructureAnalysisError(f"frame_stride must be at least 1, got {frame_stride}")
         
-        protein_atoms = self.universe.select_atoms("protein")
+        protein_atoms = self._get_protein_atoms()
         
-        # Analyze trajectory
-        for ts in self.universe.trajectory:
-            total_frames += 1
-            frame_contacts = set()
-            
-            # Find contacts in this frame
-            for target_atom in target_atoms:
-                target_pos = target_atom.position
-                
-                for protein_atom in protein_atoms:
-                    # Skip if same residue
-                    if (hasattr(target_atom, 'resid') and hasattr(protein_atom, 'resid')
-                        and target_atom.resid == protein_atom.resid):
-                        continue
-                    
-                    distance = np.linalg.norm(target_pos - protein_atom.position)
-                    
-                    if distance <= cutoff_distance:
-                        frame_contacts.add(protein_atom.resid)
-            
-            # Update contact counts
-            for resid in frame_contacts:
-                residue_contacts[resid] = residue_contacts.get(resid, 0) + 1
+        # Contact counts per distinct protein resid (slot = index in sorted resids)
+        slot_resids = np.unique(protein_atoms.resids)
         
-        # Filter by occupancy threshold
-        nearby_resids = set()
-        for resid, count in residue_contacts.items():
-            occupancy = count / total_frames
-            if occupancy >= occupancy_threshold:
-                nearby_resids.add(resid)
+        frames = np.arange(len(self.universe.trajectory))[::frame_stride]
+        total_frames = len(frames)
+        n_workers = max(1, min(n_workers, total_frames))
         
-        return nearby_resids
+        if n_workers == 1:
+            contact_counts = _count_frame_contacts(
+                self.universe, target_atoms, protein_atoms,
+                cutoff_distance, pbc, frames, slot_resids
+            )
+        else:
+            # Contiguous frame ranges, one private Universe per worker
+            frame_chunks = np.array_split(frames, n_workers)
+            with ProcessPoolExecutor(max_workers=n_workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = [
+                    pool.submit(_count_frame_contacts_worker, self._universe_files,
+                                target_atoms.indices, protein_atoms.indices,
+                                cutoff_distance, pbc, chunk, slot_resids)
+                    for chunk in frame_chunks
+                ]
+                contact_counts = sum(future.result() for future in futures)
+        
+        if total_frames == 0:
+            return set()
+        
+        # Filter by occupancy threshold (residues never in contact are excluded)
+        occupancy = contact_counts / total_frames
+        selected = (contact_counts > 0) & (occupancy >= occupancy_threshold)
+        
+        return set(slot_resids[selected].tolist())
     
     def analyze_target_and_environment(self, target_selection: str, 
                                      cutoff_distance: float,
                                      use_trajectory: bool = False,
-                                     occupancy_threshold: float = 0.5) -> Dict:
+                                     occupancy_threshold: float = 0.5,
+                                     pbc: bool = False,
+                                     frame_stride: int = 1,
+                                     n_workers: int = 1) -> Dict:
         """
         Complete analysis of target region and nearby residues
         
@@ -254,6 +727,9 @@ class StructureAnalyzer:
             cutoff_distance: Cutoff distance in Angstroms
             use_trajectory: Whether to use trajectory for analysis
             occupancy_threshold: Occupancy threshold for trajectory analysis
+            pbc: Whether to use periodic (minimum image) distances
+            frame_stride: Analyze every n-th trajectory frame
+            n_workers: Number of worker processes for trajectory analysis
             
         Returns:
             Dictionary with analysis results
@@ -261,15 +737,32 @@ class StructureAnalyzer:
         # Identify target atoms
         target_atoms = self.identify_target_region(target_selection)
         
-        # Find nearby residues
+        # Find nearby residues (memoized for repeated identical requests); the
+        # trajectory is stat'ed on every call so a rewritten file is never
+        # answered from the cache, and static searches depend on the frame
         if use_trajectory:
-            nearby_resids = self.find_nearby_residues_trajectory(
-                target_atoms, cutoff_distance, occupancy_threshold
-            )
+            st = self.trajectory_file.stat() if self.trajectory_file else None
+            state = (occupancy_threshold, frame_stride,
+                     (st.st_mtime_ns, st.st_size) if st else None)
         else:
-            nearby_resids = self.find_nearby_residues_static(
-                target_atoms, cutoff_distance
-            )
+            state = (self.universe.trajectory.ts.frame,)
+        cache_key = (target_selection, cutoff_distance, use_trajectory, pbc) + state
+        
+        cached = self._nearby_cache.get(cache_key)
+        if cached is None:
+            if use_trajectory:
+                nearby_resids = self.find_nearby_residues_trajectory(
+                    target_atoms, cutoff_distance, occupancy_threshold, pbc,
+                    frame_stride, n_workers
+                )
+            else:
+                nearby_resids = self.find_nearby_residues_static(
+                    target_atoms, cutoff_distance, pbc
+                )
+            if len(self._nearby_cache) >= NEARBY_CACHE_SIZE:
+                del self._nearby_cache[next(iter(self._nearby_cache))]
+            cached = self._nearby_cache[cache_key] = tuple(sorted(nearby_resids))
+        nearby_resids = set(cached)
         
         self.nearby_residues = nearby_resids
         
@@ -289,7 +782,8 @@ class StructureAnalyzer:
         }
         
         if use_trajectory:
-            results['total_frames'] = len(self.universe.trajectory)
+            results['total_frames'] = len(self.universe.trajectory[::frame_stride])
+            results['frame_stride'] = frame_stride
             results['occupancy_threshold'] = occupancy_threshold
         
         return results
@@ -306,46 +800,19 @@ class StructureAnalyzer:
         Returns:
             Combined atom group for solute
         """
-        # Start with target atoms
-        solute_selection_parts = []
+        all_atoms = self.universe.atoms
+        nearby_resid_arr = np.fromiter(nearby_resids, dtype=np.int64, count=len(nearby_resids))
         
-        # Add target selection
         if hasattr(target_atoms, 'residues') and len(target_atoms.residues) > 0:
             # If target is residue-based, include whole residues
-            target_resids = [res.resid for res in target_atoms.residues]
-            solute_selection_parts.extend([f"resid {resid}" for resid in target_resids])
-        else:
-            # For non-residue targets (like ligands), we need a different approach
-            # This is a simplification - in practice, you might need more sophisticated logic
-            solute_selection_parts.append("same residue as (selection_placeholder)")
-        
-        # Add nearby residues
-        if nearby_resids:
-            nearby_resids_str = " ".join(map(str, sorted(nearby_resids)))
-            solute_selection_parts.append(f"resid {nearby_resids_str}")
-        
-        # Combine selections
-        if len(solute_selection_parts) > 1:
-            combined_selection = " or ".join([f"({part})" for part in solute_selection_parts])
-        else:
-            combined_selection = solute_selection_parts[0]
-        
-        # Handle the placeholder case for non-residue targets
-        if "selection_placeholder" in combined_selection:
-            # Get atom indices for target atoms and create selection
-            target_indices = " ".join(map(str, target_atoms.indices))
-            combined_selection = combined_selection.replace(
-                "same residue as (selection_placeholder)", 
-                f"index {target_indices}"
-            )
-        
-        try:
-            solute_atoms = self.universe.select_atoms(combined_selection)
-            return solute_atoms
-        except Exception as e:
-            # Fallback: just combine target atoms with nearby residue atoms
-            nearby_atoms = self.universe.select_atoms(f"resid {' '.join(map(str, nearby_resids))}")
-            return target_atoms + nearby_atoms
+            solute_resids = np.unique(np.concatenate([target_atoms.residues.resids,
+                                                      nearby_resid_arr]))
+            return all_atoms[np.isin(self._atom_resids, solute_resids)]
+        
+        # For non-residue targets (like ligands), take the same residues as the target atoms
+        target_residue_atoms = all_atoms[np.isin(all_atoms.indices, target_atoms.indices)].residues.atoms
+        nearby_atoms = all_atoms[np.isin(self._atom_resids, nearby_resid_arr)]
+        return target_residue_atoms | nearby_atoms
     
     def get_selected_residues_info(self, analysis_results: Optional[Dict] = None) -> List[Dict]:
         """
@@ -368,7 +835,7 @@ class StructureAnalyzer:
         
         for resid in sorted(nearby_residues):
             try:
-                residue = self.universe.select_atoms(f"resid {resid}").residues[0]
+                residue = self._residue_for_resid(resid)
                 info = {
                     'resid': resid,
                     'resname': residue.resname,
@@ -376,7 +843,7 @@ class StructureAnalyzer:
                     'atom_count': len(residue.atoms)
                 }
                 residue_info.append(info)
-            except (IndexError, AttributeError):
+            except (KeyError, AttributeError):
                 # Handle cases where residue might not be found
                 residue_info.append({
                     'resid': resid,
@@ -4,13 +4,22 @@ REST2 Temperature Controller Module
 Handles temperature-specific topology modifications and input file preparation
 """
 
+import io
+import mmap
 import os
 import shutil
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Union
 import numpy as np
 
+# Upper bound on threads writing replica files concurrently
+MAX_IO_WORKERS = 32
+
+# PLUMED output file names (FILE=name.ext)
+_PLUMED_FILE_RE = re.compile(r'FILE=(\w+)\.(\w+)')
+
 
 class TemperatureControllerError(Exception):
     """Temperature controller error"""
@@ -46,18 +55,31 @@ class TemperatureController:
         # Reference temperature (lowest temperature)
         self.T_ref = min(self.temperatures)
         
+        # Simulation parameters shared by all replicas
+        self.production_time_ns = self.config.get_parameter('simulation.production_time', 100.0)
+        self.replex = self.config.get_parameter('replex')
+        
+        # User PLUMED input appended to every replica's plumed.dat (read once)
+        plumed_dat = self.config.get_parameter('plumed_dat')
+        self._plumed_template_content = ""
+        if plumed_dat and Path(plumed_dat).exists():
+            self._plumed_template_content = Path(plumed_dat).read_text()
+        
         # Solute atoms for PLUMED REST2
         self.solute_atom_indices = None
         if solute_data and 'solute_atom_indices' in solute_data:
-            # Convert to 1-based indexing for PLUMED and ensure it's a Python list
-            solute_indices = solute_data['solute_atom_indices']
-            if hasattr(solute_indices, 'tolist'):  # numpy array
-                self.solute_atom_indices = [int(idx) + 1 for idx in solute_indices.tolist()]
-            else:  # Python list
-                self.solute_atom_indices = [int(idx) + 1 for idx in solute_indices]
+            # Convert to 1-based indexing for PLUMED (int64 array)
+            self.solute_atom_indices = np.asarray(solute_data['solute_atom_indices'],
+                                                  dtype=np.int64) + 1
             
             # Validate solute data
             self._validate_solute_data(solute_data)
+        
+        # PLUMED atom list is the same for every replica; format it once
+        if self.solute_atom_indices is not None and len(self.solute_atom_indices) > 0:
+            self._atom_list_str = self._format_atom_list(self.solute_atom_indices)
+        else:
+            self._atom_list_str = "1-100  # EDIT THIS: Replace with actual solute atom indices"
     
     def _validate_solute_data(self, solute_data: Dict[str, Any]) -> None:
         """Validate solute data consistency"""
@@ -87,6 +109,18 @@ class TemperatureController:
             nearby_count = len(nearby_residues)
             print(f"Nearby residues: {nearby_count}")
     
+    def _for_each_replica(self, task: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Run an I/O-bound task for every replica on a thread pool
+        
+        Args:
+            task: Function called with each replica dictionary
+        """
+        n_workers = max(1, min(MAX_IO_WORKERS, len(self.replicas)))
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            # Consume results so worker exceptions propagate
+            list(pool.map(task, self.replicas))
+    
     def generate_scaled_topology_files(self, base_topology: str) -> None:
         """
         Generate topology files for each replica (no scaling needed for PLUMED REST2)
@@ -98,41 +132,40 @@ class TemperatureController:
         if not base_topology_path.exists():
             raise FileNotFoundError(f"Base topology file not found: {base_topology}")
         
-        for replica in self.replicas:
-            replica_index = replica['index']
+        def create_topology(replica: Dict[str, Any]) -> None:
             input_dir = Path(replica['input_dir'])
             
             # For PLUMED REST2, we just copy the base topology
             # The scaling is handled by PLUMED PARTIAL_TEMPERING
             scaled_topology_path = input_dir / "topol.top"
-            self._create_replica_topology(
-                base_topology_path, 
-                scaled_topology_path, 
-                replica_index
-            )
+            self._create_replica_topology(base_topology_path, scaled_topology_path)
+        
+        self._for_each_replica(create_topology)
     
-    def _create_replica_topology(self, base_topology: Path, output_topology: Path,
-                               replica_index: int) -> None:
+    def _create_replica_topology(self, base_topology: Path, output_topology: Path) -> None:
         """
         Create replica topology file (for PLUMED REST2, no parameter scaling needed)
         
+        The topology is identical for all replicas, so it is copied as is
+        (shutil.copyfile uses the kernel copy path on Linux). Each replica gets
+        its own file: the base topology is rewritten in place by later setup
+        runs, so a hard link would change earlier runs' replicas too.
+        
         Args:
             base_topology: Base topology file path
             output_topology: Output topology file path
-            replica_index: Replica index
         """
-        with open(base_topology, 'r') as f:
-            content = f.read()
-        
-        # Write topology
-        with open(output_topology, 'w') as f:
-            f.write(content)
+        shutil.copyfile(base_topology, output_topology)
     
     def generate_mdp_files(self) -> None:
         """Generate MDP files for each replica with appropriate temperature settings"""
         base_mdp_content = self._create_base_mdp_template()
         
-        for replica in self.replicas:
+        # Number of steps is the same for every replica
+        dt_ps = 0.002  # 2 fs
+        nsteps = int(self.production_time_ns * 1000 / dt_ps)  # Convert ns to steps
+        
+        def write_mdp(replica: Dict[str, Any]) -> None:
             replica_index = replica['index']
             temperature = replica['temperature']
             input_dir = Path(replica['input_dir'])
@@ -141,22 +174,27 @@ class TemperatureController:
             mdp_content = self._customize_mdp_for_replica(
                 base_mdp_content, 
                 replica_index, 
-                temperature
+                temperature,
+                nsteps
             )
             
             # Write MDP file
             mdp_file = input_dir / "rest2.mdp"
-            with open(mdp_file, 'w') as f:
-                f.write(mdp_content)
+            mdp_file.write_text(mdp_content)
+        
+        self._for_each_replica(write_mdp)
     
     def _create_base_mdp_template(self) -> str:
-        """Create base MDP template for REST2 simulation"""
-        replex = self.config.get_parameter('replex')
+        """
+        Create base MDP template for REST2 simulation
         
+        Returns:
+            MDP content with {temperature} and {nsteps} format fields
+        """
         mdp_template = f"""title                   = REST2 Enhanced Sampling
 ; Run parameters
 integrator              = md            ; leap-frog integrator
-nsteps                  = NSTEPS_PLACEHOLDER    ; Will be set from config
+nsteps                  = {{nsteps}}    ; Will be set from config
 dt                      = 0.002         ; 2 fs
 
 ; Output control
@@ -191,7 +229,7 @@ fourierspacing          = 0.16          ; grid spacing for FFT
 tcoupl                  = V-rescale     ; modified Berendsen thermostat
 tc-grps                 = Protein Non-Protein   ; two coupling groups
 tau_t                   = 0.1     0.1           ; time constant, in ps
-ref_t                   = TEMP_PLACEHOLDER TEMP_PLACEHOLDER   ; reference temperature
+ref_t                   = {{temperature:.1f}} {{temperature:.1f}}   ; reference temperature
 
 ; Pressure coupling
 pcoupl                  = Parrinello-Rahman     ; Pressure coupling on in NPT
@@ -210,12 +248,12 @@ DispCorr                = EnerPres      ; account for cut-off vdW scheme
 gen_vel                 = no            ; Velocity generation is off
 
 ; Replica exchange
-nstreplex               = {replex}
+nstreplex               = {self.replex}
 """
         return mdp_template
     
     def _customize_mdp_for_replica(self, base_mdp: str, replica_index: int, 
-                                 temperature: float) -> str:
+                                 temperature: float, nsteps: int) -> str:
         """
         Customize MDP content for specific replica
         
@@ -223,24 +261,19 @@ nstreplex               = {replex}
             base_mdp: Base MDP template
             replica_index: Index of current replica
             temperature: Temperature for this replica
+            nsteps: Number of MD steps
             
         Returns:
             Customized MDP content
         """
-        # Calculate nsteps from simulation time
-        production_time_ns = self.config.get_parameter('simulation.production_time', 100.0)
-        dt_ps = 0.002  # 2 fs
-        nsteps = int(production_time_ns * 1000 / dt_ps)  # Convert ns to steps
-        
-        # Replace placeholders
-        customized_mdp = base_mdp.replace("TEMP_PLACEHOLDER", f"{temperature:.1f}")
-        customized_mdp = customized_mdp.replace("NSTEPS_PLACEHOLDER", str(nsteps))
+        # Fill template fields
+        customized_mdp = base_mdp.format(temperature=temperature, nsteps=nsteps)
         
         # Add replica-specific header
         header = f"""; Replica {replica_index} MDP File
 ; Temperature: {temperature:.1f} K
 ; REST2 scaling factor (λ): {self.scaling_factors[replica_index]:.6f}
-; Simulation time: {production_time_ns:.1f} ns ({nsteps} steps)
+; Simulation time: {self.production_time_ns:.1f} ns ({nsteps} steps)
 
 """
         
@@ -248,11 +281,13 @@ nstreplex               = {replex}
     
     def prepare_additional_input_files(self) -> None:
         """Prepare additional input files needed for each replica (不再生成index.ndx)"""
-        for replica in self.replicas:
+        def prepare_files(replica: Dict[str, Any]) -> None:
             replica_index = replica['index']
             input_dir = Path(replica['input_dir'])
             # 只处理PLUMED文件
             self._prepare_plumed_file(input_dir, replica_index)
+        
+        self._for_each_replica(prepare_files)
     
     def _prepare_plumed_file(self, input_dir: Path, replica_index: int) -> None:
         """
@@ -262,23 +297,11 @@ nstreplex               = {replex}
             input_dir: Replica input directory
             replica_index: Replica index
         """
-        plumed_dat = self.config.get_parameter('plumed_dat')
-        
         # Add PARTIAL_TEMPERING command for REST2
         rest2_command = self._create_partial_tempering_command(replica_index)
         
-        # Read original PLUMED content if exists
-        original_content = ""
-        if plumed_dat and Path(plumed_dat).exists():
-            with open(plumed_dat, 'r') as f:
-                original_content = f.read()
-        
         # Write PLUMED file
-        with open(input_dir / "plumed.dat", 'w') as f:
-            f.write(rest2_command)
-            f.write("\n")
-            if original_content:
-                f.write(original_content)
+        (input_dir / "plumed.dat").write_text(rest2_command + "\n" + self._plumed_template_content)
     
     def _create_partial_tempering_command(self, replica_index: int) -> str:
         """
@@ -290,17 +313,10 @@ nstreplex               = {replex}
         Returns:
             PARTIAL_TEMPERING command string
         """
-        temperature = self.temperatures[replica_index]
         scaling_factor = self.scaling_factors[replica_index]
         
-        # Create atom list for PARTIAL_TEMPERING
-        if self.solute_atom_indices is not None and len(self.solute_atom_indices) > 0:
-            atom_list = self._format_atom_list(self.solute_atom_indices)
-        else:
-            atom_list = "1-100  # EDIT THIS: Replace with actual solute atom indices"
-        
         partial_tempering_cmd = f"""PARTIAL_TEMPERING ...
-  ATOMS={atom_list}
+  ATOMS={self._atom_list_str}
   TEMP={self.T_ref:.1f}
   LAMBDA={scaling_factor:.6f}
   LABEL=rest2_scaling
@@ -310,43 +326,31 @@ nstreplex               = {replex}
         
         return partial_tempering_cmd
     
-    def _format_atom_list(self, atom_indices: List[int]) -> str:
+    def _format_atom_list(self, atom_indices: Union[List[int], np.ndarray]) -> str:
         """
         Format atom indices list for PLUMED
         
         Args:
-            atom_indices: List of atom indices (1-based)
+            atom_indices: List or array of atom indices (1-based)
             
         Returns:
             Formatted atom list string
         """
-        if not atom_indices:
+        if len(atom_indices) == 0:
             return "1-100  # EDIT THIS: Replace with actual solute atom indices"
         
         # Sort indices
-        sorted_indices = sorted(atom_indices)
+        sorted_indices = np.sort(np.asarray(atom_indices, dtype=np.int64))
         
-        # Group consecutive indices into ranges
-        ranges = []
-        start = sorted_indices[0]
-        end = start
+        # Group consecutive indices into ranges (a run breaks where the step is not 1)
+        breaks = np.flatnonzero(np.diff(sorted_indices) != 1)
+        run_starts = sorted_indices[np.concatenate(([0], breaks + 1))]
+        run_ends = sorted_indices[np.concatenate((breaks, [len(sorted_indices) - 1]))]
         
-        for i in range(1, len(sorted_indices)):
-            if sorted_indices[i] == end + 1:
-                end = sorted_indices[i]
-            else:
-                if start == end:
-                    ranges.append(str(start))
-                else:
-                    ranges.append(f"{start}-{end}")
-                start = sorted_indices[i]
-                end = start
-        
-        # Add the last range
-        if start == end:
-            ranges.append(str(start))
-        else:
-            ranges.append(f"{start}-{end}")
+        ranges = [
+            str(start) if start == end else f"{start}-{end}"
+            for start, end in zip(run_starts.tolist(), run_ends.tolist())
+        ]
         
         # Join ranges with better formatting
         atom_list = ",".join(ranges)
@@ -389,23 +393,15 @@ nstreplex               = {replex}
         Returns:
             Customized PLUMED content
         """
-        # Replace common output file patterns with replica-specific names
-        patterns = [
-            (r'FILE=(\w+)\.(\w+)', rf'FILE=\1_replica{replica_index}.\2'),
-            (r'STRIDE=(\d+)', r'STRIDE=\1'),  # Keep stride as is
-        ]
-        
-        customized = plumed_content
-        for pattern, replacement in patterns:
-            customized = re.sub(pattern, replacement, customized)
-        
-        return customized
+        # Replace output file names with replica-specific names
+        return _PLUMED_FILE_RE.sub(rf'FILE=\1_replica{replica_index}.\2', plumed_content)
     
     def create_temperature_summary(self) -> None:
         """Create summary file with temperature information"""
         summary_path = Path(self.replica_data['base_output_dir']) / "temperature_summary.txt"
         
-        summary_content = f"""# REST2 Temperature Summary
+        summary = io.StringIO()
+        summary.write(f"""# REST2 Temperature Summary
 # Generated automatically
 
 Total replicas: {self.n_replicas}
@@ -416,17 +412,17 @@ Scaling method: {self.replica_data.get('scaling_method', 'unknown')}
 Replica Information:
 {'Index':<6} {'Temperature (K)':<15} {'λ factor':<12} {'√λ factor':<12}
 {'-'*50}
-"""
+""")
         
-        for replica in self.replicas:
+        sqrt_lambdas = np.sqrt([replica['scaling_factor'] for replica in self.replicas])
+        for replica, sqrt_lambda in zip(self.replicas, sqrt_lambdas):
             idx = replica['index']
             temp = replica['temperature']
             lambda_val = replica['scaling_factor']
-            sqrt_lambda = np.sqrt(lambda_val)
             
-            summary_content += f"{idx:<6} {temp:<15.1f} {lambda_val:<12.6f} {sqrt_lambda:<12.6f}\n"
+            summary.write(f"{idx:<6} {temp:<15.1f} {lambda_val:<12.6f} {sqrt_lambda:<12.6f}\n")
         
-        summary_content += f"""
+        summary.write(f"""
 {'-'*50}
 
 REST2 Scaling Explanation:
@@ -438,10 +434,9 @@ Files generated for each replica:
 - topol.top: Temperature-scaled topology file
 - rest2.mdp: MDP file with replica-specific temperature
 - plumed.dat: PLUMED file with replica-specific outputs (if applicable)
-"""
+""")
         
-        with open(summary_path, 'w') as f:
-            f.write(summary_content)
+        summary_path.write_text(summary.getvalue())
     
     def validate_temperature_setup(self) -> bool:
         """
@@ -470,11 +465,10 @@ Files generated for each replica:
             # MDP温度检查同前
             mdp_file = input_dir / "rest2.mdp"
             if mdp_file.exists():
-                with open(mdp_file, 'r') as f:
-                    content = f.read()
-                    expected_temp = f"{replica['temperature']:.1f}"
-                    if f"ref_t                   = {expected_temp} {expected_temp}" not in content:
-                        errors.append(f"Replica {replica_index}: MDP file missing correct temperature")
+                expected_temp = f"{replica['temperature']:.1f}"
+                expected_line = f"ref_t                   = {expected_temp} {expected_temp}"
+                if not self._file_contains(mdp_file, expected_line.encode()):
+                    errors.append(f"Replica {replica_index}: MDP file missing correct temperature")
         if errors:
             print("Temperature setup validation errors:")
             for error in errors:
@@ -484,6 +478,24 @@ Files generated for each replica:
         print("All replicas ready for REST2 simulation")
         return True
     
+    @staticmethod
+    def _file_contains(file_path: Path, needle: bytes) -> bool:
+        """
+        Check whether a file contains a byte string (memory-mapped, no decoding)
+        
+        Args:
+            file_path: File to search
+            needle: Byte string to find
+            
+        Returns:
+            True if the byte string occurs in the file
+        """
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm.find(needle) >= 0
+    
     def print_temperature_summary(self) -> None:
         """Print temperature setup summary"""
         print(f"Temperature setup:")
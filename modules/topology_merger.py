@@ -4,9 +4,31 @@ REST2 Topology Merger Module
 Simple topology merging using gmx grompp -pp
 """
 
+import os
 import subprocess
+import tempfile
 from pathlib import Path
 
+# Amount of grompp log shown when the merge fails
+GROMPP_LOG_TAIL_BYTES = 8192
+
+
+def _read_log_tail(log_path: Path, max_bytes: int = GROMPP_LOG_TAIL_BYTES) -> str:
+    """
+    Read the end of a log file
+    
+    Args:
+        log_path: Log file path
+        max_bytes: Maximum number of bytes to read
+        
+    Returns:
+        Last max_bytes of the log, decoded as text
+    """
+    with open(log_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - max_bytes))
+        return f.read().decode(errors='replace')
+
 
 def merge_topology_files(main_topology: str, output_topology: str, 
                         structure_file: str) -> bool:
@@ -63,18 +85,28 @@ def merge_topology_files(main_topology: str, output_topology: str,
             '-pp', str(Path(output_topology).absolute())
         ]
         
-        # Run grompp
+        # Run grompp, streaming its (possibly large) output to a temporary log
+        # file; the log is kept only when grompp fails, for inspection
         print(f"  Command: {' '.join(cmd)}")
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=main_top_path.parent
-        )
-        
-        if result.returncode != 0:
-            print(f"  Error output: {result.stderr}")
-            return False
+        log_fd, log_name = tempfile.mkstemp(prefix='grompp_', suffix='.log')
+        log_path = Path(log_name)
+        keep_log = False
+        try:
+            with os.fdopen(log_fd, 'wb') as log_file:
+                result = subprocess.run(
+                    cmd,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    cwd=main_top_path.parent
+                )
+            
+            if result.returncode != 0:
+                keep_log = True
+                print(f"  Error output (end of {log_path}): {_read_log_tail(log_path)}")
+                return False
+        finally:
+            if not keep_log:
+                log_path.unlink()
         
         # Check if output file was created
         output_path = Path(output_topology)
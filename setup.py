@@ -55,6 +55,9 @@ setup(
             "jupyter>=1.0.0",
             "ipykernel>=6.0.0",
         ],
+        "performance": [
+            "numba>=0.56.0",
+        ],
     },
     entry_points={
         "console_scripts": [
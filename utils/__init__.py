@@ -4,11 +4,28 @@ REST2 Utils Package
 Utility modules for REST2 enhanced sampling simulations
 """
 
-from .temperature_calculator import TemperatureCalculator, TemperatureCalculationError
+import importlib
+
 from .validation_framework import ValidationFramework, ValidationError
 from .file_utils import FileUtils, FileOperationError
 from .output_formatter import OutputFormatter
 
+# Exports imported on first access: the temperature calculator pulls in NumPy
+# (and Numba if installed), which tools that only validate or format never need
+_LAZY_EXPORTS = {
+    'TemperatureCalculator': '.temperature_calculator',
+    'TemperatureCalculationError': '.temperature_calculator',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 __all__ = [
     'TemperatureCalculator',
     'TemperatureCalculationError', 
@@ -4,12 +4,258 @@ REST2 File Utilities Module
 Unified file operations for REST2 enhanced sampling simulations
 """
 
+import copy
+import filecmp
 import os
 import shutil
+import stat
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union
+from types import MappingProxyType
+from typing import List, Dict, Any, Iterator, Mapping, Optional, Set, Union
 import yaml
 
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:
+    # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
+
+class _YamlDumper(_SafeDumper):
+    """Safe dumper that also writes NumPy scalars (e.g. np.float64) as plain values"""
+
+
+def _represent_fallback(dumper: _YamlDumper, data: Any) -> Any:
+    """Represent NumPy scalars via .item(); other unknown types are rejected as before"""
+    if type(data).__module__ == 'numpy' and getattr(data, 'ndim', None) == 0:
+        return dumper.represent_data(data.item())
+    return dumper.represent_undefined(data)
+
+
+_YamlDumper.add_multi_representer(object, _represent_fallback)
+
+
+# Parsed YAML files keyed by resolved path: [(mtime_ns, size), data, frozen data or None],
+# least recently used first
+_YAML_CACHE: "OrderedDict[str, List[Any]]" = OrderedDict()
+_YAML_CACHE_MAX = 100
+
+# Directories already created/verified by this process
+_ENSURED_DIRS: Set[str] = set()
+_ENSURED_DIRS_LOCK = threading.Lock()
+
+# Binary flag is needed on Windows and absent elsewhere
+_O_BINARY = getattr(os, 'O_BINARY', 0)
+
+
+def _try_stat(path: Union[str, Path]) -> Optional[os.stat_result]:
+    """Stat a path, returning None if it does not exist"""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _dir_entry_set(dir_path: Union[str, Path]) -> Optional[Set[str]]:
+    """
+    Names of existing entries in a directory, from a single scandir pass
+    
+    Returns None if the directory does not exist (empty set if it is not a
+    directory). Broken symlinks are left out, matching Path.exists().
+    """
+    try:
+        with os.scandir(dir_path) as entries:
+            return {entry.name for entry in entries
+                    if not entry.is_symlink() or os.path.exists(entry.path)}
+    except FileNotFoundError:
+        return None
+    except NotADirectoryError:
+        # A file has no entries, but a path through a file does not exist
+        return set() if os.path.exists(dir_path) else None
+
+
+def _entry_exists(dir_path: Union[str, Path], present: Set[str], filename: str) -> bool:
+    """Check a name against a _dir_entry_set result (stat for nested paths)"""
+    if os.sep in filename or (os.altsep and os.altsep in filename):
+        return _try_stat(os.path.join(dir_path, filename)) is not None
+    return filename in present
+
+
+def _ensure_dir(dir_path: Union[str, Path], refresh: bool = False) -> None:
+    """
+    Create a directory and its parents once per process
+    
+    Later calls for the same directory are a set lookup. Pass refresh=True
+    after a write failed because the directory was removed in the meantime.
+    """
+    key = os.fspath(dir_path)
+    if not refresh and key in _ENSURED_DIRS:
+        return
+    os.makedirs(key, exist_ok=True)
+    with _ENSURED_DIRS_LOCK:
+        _ENSURED_DIRS.add(key)
+
+
+def _ensure_parent(path: Path, refresh: bool = False) -> None:
+    """Ensure the parent directory of a file exists (see _ensure_dir)"""
+    _ensure_dir(path.parent, refresh)
+
+
+def _make_dir(path: Union[str, Path]) -> None:
+    """Create one directory level (parents only if missing); ok if it exists"""
+    try:
+        os.mkdir(path)
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+    except FileExistsError:
+        if not os.path.isdir(path):
+            raise
+
+
+def _prepare_write(path_obj: Path, overwrite: bool, backup: bool,
+                   content: Optional[bytes] = None) -> None:
+    """
+    Create the parent directory and handle an existing target before writing
+    
+    Args:
+        path_obj: Target file path
+        overwrite: Whether to overwrite existing file
+        backup: Whether to create backup of existing file
+        content: Bytes about to be written, if known (no backup is made
+            of an existing file that already holds them)
+        
+    Raises:
+        FileOperationError: If the file exists and overwrite is False
+    """
+    # Create directory if needed
+    _ensure_parent(path_obj)
+    
+    # Handle existing file
+    st = _try_stat(path_obj)
+    if st is not None:
+        if not overwrite:
+            raise FileOperationError(f"File exists: {path_obj}")
+        
+        backup_path = path_obj.with_suffix(path_obj.suffix + '.backup')
+        if backup and not backup_path.exists():
+            # Unchanged content needs no backup (sizes are compared before reading)
+            unchanged = (content is not None and st.st_size == len(content)
+                         and _read_bytes(path_obj) == content)
+            if not unchanged:
+                shutil.copy2(path_obj, backup_path)
+
+
+def _read_bytes(path: Union[str, Path]) -> bytes:
+    """Read a whole file with os.read, sized from a single fstat"""
+    fd = os.open(path, os.O_RDONLY | _O_BINARY)
+    try:
+        size = os.fstat(fd).st_size
+        chunks = [os.read(fd, max(size, 1))]
+        # Keep reading in case the file grew or the read was short
+        while chunks[-1]:
+            chunks.append(os.read(fd, 1 << 16))
+        return b''.join(chunks)
+    finally:
+        os.close(fd)
+
+
+def _write_bytes(path: Union[str, Path], data: bytes) -> None:
+    """Write a whole file with os.write (truncating any existing content)"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _copy_file(src: Path, dst: Path) -> None:
+    """
+    Copy file contents and metadata (like shutil.copy2)
+    
+    Uses os.copy_file_range where available, which can share extents on
+    copy-on-write filesystems; otherwise shutil.copyfile (sendfile on Linux).
+    """
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    copied = False
+    if copy_file_range is not None:
+        src_fd = os.open(src, os.O_RDONLY)
+        try:
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                remaining = os.fstat(src_fd).st_size
+                while remaining > 0:
+                    sent = copy_file_range(src_fd, dst_fd, remaining)
+                    if sent == 0:
+                        break
+                    remaining -= sent
+                copied = remaining == 0
+            except OSError:
+                # Unsupported by kernel or filesystem pair
+                copied = False
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+    
+    if not copied:
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+
+def _freeze(obj: Any, memo: Optional[Dict[int, Any]] = None) -> Any:
+    """
+    Read-only view of parsed YAML: dicts become MappingProxyType, lists tuples
+    
+    Objects shared through YAML anchors are frozen once and stay shared.
+    """
+    if not isinstance(obj, (dict, list)):
+        return obj
+    if memo is None:
+        memo = {}
+    frozen = memo.get(id(obj))
+    if frozen is None:
+        if isinstance(obj, dict):
+            frozen = MappingProxyType({key: _freeze(value, memo) for key, value in obj.items()})
+        else:
+            frozen = tuple(_freeze(item, memo) for item in obj)
+        memo[id(obj)] = frozen
+    return frozen
+
+
+def _load_yaml_entry(file_path: Union[str, Path]) -> List[Any]:
+    """
+    Cache entry for a YAML file, parsing it if it changed since it was cached
+    
+    Returns:
+        [(mtime_ns, size), data, frozen data or None]; not cached if stat fails
+    """
+    cache_key = str(Path(file_path).resolve())
+    try:
+        st = os.stat(cache_key)
+        signature = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        signature = None
+    
+    cached = _YAML_CACHE.get(cache_key)
+    if signature is not None and cached is not None and cached[0] == signature:
+        _YAML_CACHE.move_to_end(cache_key)
+        return cached
+    
+    content = FileUtils.safe_read(file_path)
+    entry = [signature, yaml.load(content, Loader=_SafeLoader) or {}, None]
+    
+    if signature is not None:
+        _YAML_CACHE[cache_key] = entry
+        _YAML_CACHE.move_to_end(cache_key)
+        if len(_YAML_CACHE) > _YAML_CACHE_MAX:
+            _YAML_CACHE.popitem(last=False)
+    
+    return entry
+
 
 class FileOperationError(Exception):
     """File operation error"""
@@ -36,7 +282,8 @@ class FileUtils:
         """
         path_obj = Path(path)
         if create_parents:
-            path_obj.mkdir(parents=True, exist_ok=True)
+            # Always verified (callers rely on it), and recorded for later writes
+            _ensure_dir(path_obj, refresh=True)
         else:
             path_obj.mkdir(exist_ok=True)
         return path_obj
@@ -62,25 +309,38 @@ class FileUtils:
         src_path = Path(src)
         dst_path = Path(dst)
         
-        if not src_path.exists():
+        src_st = _try_stat(src_path)
+        if src_st is None:
             raise FileOperationError(f"Source file not found: {src_path}")
         
         # Create destination directory if needed
-        dst_path.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_parent(dst_path)
         
         # Handle existing destination file
-        if dst_path.exists():
+        dst_st = _try_stat(dst_path)
+        if dst_st is not None:
             if not overwrite:
                 raise FileOperationError(f"Destination file exists: {dst_path}")
             
-            if backup:
+            # Same size and mtime: already a copy of src (copies preserve mtime)
+            same_size = src_st.st_size == dst_st.st_size
+            if same_size and src_st.st_mtime_ns == dst_st.st_mtime_ns:
+                return dst_path
+            
+            # Identical content needs no backup; the copy still refreshes metadata
+            if backup and not (same_size and filecmp.cmp(src_path, dst_path, shallow=False)):
                 backup_path = dst_path.with_suffix(dst_path.suffix + '.backup')
                 if not backup_path.exists():
                     shutil.copy2(dst_path, backup_path)
         
         # Copy file
         try:
-            shutil.copy2(src_path, dst_path)
+            try:
+                _copy_file(src_path, dst_path)
+            except FileNotFoundError:
+                # Destination directory removed since it was ensured
+                _ensure_parent(dst_path, refresh=True)
+                _copy_file(src_path, dst_path)
             return dst_path
         except Exception as e:
             raise FileOperationError(f"Failed to copy {src_path} to {dst_path}: {e}")
@@ -101,24 +361,21 @@ class FileUtils:
             Path object for the written file
         """
         path_obj = Path(file_path)
+        try:
+            data = content.encode('utf-8')
+        except Exception as e:
+            raise FileOperationError(f"Failed to write to {path_obj}: {e}")
         
-        # Create directory if needed
-        path_obj.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Handle existing file
-        if path_obj.exists():
-            if not overwrite:
-                raise FileOperationError(f"File exists: {path_obj}")
-            
-            if backup:
-                backup_path = path_obj.with_suffix(path_obj.suffix + '.backup')
-                if not backup_path.exists():
-                    shutil.copy2(path_obj, backup_path)
+        _prepare_write(path_obj, overwrite, backup, data)
         
         # Write content
         try:
-            with open(path_obj, 'w', encoding='utf-8') as f:
-                f.write(content)
+            try:
+                _write_bytes(path_obj, data)
+            except FileNotFoundError:
+                # Directory removed since it was ensured
+                _ensure_parent(path_obj, refresh=True)
+                _write_bytes(path_obj, data)
             return path_obj
         except Exception as e:
             raise FileOperationError(f"Failed to write to {path_obj}: {e}")
@@ -139,20 +396,26 @@ class FileUtils:
         """
         path_obj = Path(file_path)
         
-        if not path_obj.exists():
-            raise FileOperationError(f"File not found: {path_obj}")
-        
         try:
-            with open(path_obj, 'r', encoding='utf-8') as f:
-                return f.read()
+            content = _read_bytes(path_obj).decode('utf-8')
+        except FileNotFoundError:
+            raise FileOperationError(f"File not found: {path_obj}")
         except Exception as e:
             raise FileOperationError(f"Failed to read {path_obj}: {e}")
+        
+        # Universal newlines, as in text-mode reads
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
     
     @staticmethod
     def load_yaml(file_path: Union[str, Path]) -> Dict[str, Any]:
         """
         Load YAML file
         
+        Parsed files are cached until their modification time or size changes;
+        each call returns an independent copy.
+        
         Args:
             file_path: YAML file path
             
@@ -163,8 +426,35 @@ class FileUtils:
             FileOperationError: If YAML loading fails
         """
         try:
-            content = FileUtils.safe_read(file_path)
-            return yaml.safe_load(content) or {}
+            return copy.deepcopy(_load_yaml_entry(file_path)[1])
+        except yaml.YAMLError as e:
+            raise FileOperationError(f"Invalid YAML format in {file_path}: {e}")
+        except Exception as e:
+            raise FileOperationError(f"Failed to load YAML from {file_path}: {e}")
+    
+    @staticmethod
+    def load_yaml_readonly(file_path: Union[str, Path]) -> Mapping[str, Any]:
+        """
+        Load YAML file as a read-only mapping
+        
+        Same caching as load_yaml, but returns a frozen view shared between
+        calls (mappings are MappingProxyType, lists are tuples) instead of a
+        deep copy. Use load_yaml if the result will be modified.
+        
+        Args:
+            file_path: YAML file path
+            
+        Returns:
+            Read-only mapping with YAML content
+            
+        Raises:
+            FileOperationError: If YAML loading fails
+        """
+        try:
+            entry = _load_yaml_entry(file_path)
+            if entry[2] is None:
+                entry[2] = _freeze(entry[1])
+            return entry[2]
         except yaml.YAMLError as e:
             raise FileOperationError(f"Invalid YAML format in {file_path}: {e}")
         except Exception as e:
@@ -176,6 +466,9 @@ class FileUtils:
         """
         Save data to YAML file
         
+        Only plain YAML types are written (safe dumper); NumPy scalars are
+        converted to the matching Python number first.
+        
         Args:
             data: Data to save
             file_path: Target YAML file path
@@ -186,37 +479,89 @@ class FileUtils:
             Path object for the saved file
         """
         try:
-            content = yaml.dump(data, default_flow_style=default_flow_style, indent=indent)
-            return FileUtils.safe_write(content, file_path)
+            path_obj = Path(file_path)
+            _YAML_CACHE.pop(str(path_obj.resolve()), None)
+            _prepare_write(path_obj, overwrite=False, backup=True)
+            
+            # Stream directly into the file (no intermediate string)
+            try:
+                f = open(path_obj, 'w', encoding='utf-8')
+            except FileNotFoundError:
+                # Directory removed since it was ensured
+                _ensure_parent(path_obj, refresh=True)
+                f = open(path_obj, 'w', encoding='utf-8')
+            try:
+                with f:
+                    yaml.dump(data, f, Dumper=_YamlDumper,
+                              default_flow_style=default_flow_style, indent=indent)
+            except Exception:
+                # Do not leave a partially written file behind
+                path_obj.unlink()
+                raise
+            
+            return path_obj
         except Exception as e:
             raise FileOperationError(f"Failed to save YAML to {file_path}: {e}")
     
     @staticmethod
-    def find_files(directory: Union[str, Path], patterns: List[str], 
-                   recursive: bool = True) -> List[Path]:
+    def iter_files(directory: Union[str, Path], patterns: List[str], 
+                   recursive: bool = True) -> Iterator[Path]:
         """
-        Find files matching patterns in directory
+        Iterate over files matching patterns in directory
+        
+        Matches are produced lazily, so callers that stop early (e.g. only
+        checking whether anything matches) do not scan the whole tree.
         
         Args:
             directory: Directory to search
             patterns: List of file patterns (glob)
             recursive: Whether to search recursively
             
-        Returns:
-            List of matching file paths
+        Yields:
+            Unique matching file paths, in order of first match
         """
         dir_path = Path(directory)
         if not dir_path.exists():
-            return []
+            return
         
-        found_files = []
+        seen = set()
         for pattern in patterns:
-            if recursive:
-                found_files.extend(dir_path.rglob(pattern))
-            else:
-                found_files.extend(dir_path.glob(pattern))
+            matches = dir_path.rglob(pattern) if recursive else dir_path.glob(pattern)
+            for file_path in matches:
+                # Skip duplicates matched by earlier patterns
+                if file_path not in seen:
+                    seen.add(file_path)
+                    yield file_path
+    
+    @staticmethod
+    def find_files(directory: Union[str, Path], patterns: List[str], 
+                   recursive: bool = True) -> List[Path]:
+        """
+        Find files matching patterns in directory
         
-        return list(set(found_files))  # Remove duplicates
+        Args:
+            directory: Directory to search
+            patterns: List of file patterns (glob)
+            recursive: Whether to search recursively
+            
+        Returns:
+            List of unique matching file paths, in order of first match
+        """
+        return list(FileUtils.iter_files(directory, patterns, recursive))
+    
+    @staticmethod
+    def list_entry_names(directory: Union[str, Path]) -> Optional[Set[str]]:
+        """
+        Names of existing entries in a directory, from a single scandir pass
+        
+        Args:
+            directory: Directory to list
+            
+        Returns:
+            Set of entry names (broken symlinks left out), an empty set if the
+            path is a file, or None if it does not exist
+        """
+        return _dir_entry_set(directory)
     
     @staticmethod
     def auto_detect_files(directory: Union[str, Path], 
@@ -232,16 +577,16 @@ class FileUtils:
             Dictionary mapping config keys to found file paths
         """
         dir_path = Path(directory)
-        if not dir_path.exists():
+        present = _dir_entry_set(dir_path)
+        if present is None:
             return {key: None for key in file_mapping.keys()}
         
         results = {}
         for config_key, possible_names in file_mapping.items():
             results[config_key] = None
             for filename in possible_names:
-                file_path = dir_path / filename
-                if file_path.exists():
-                    results[config_key] = str(file_path)
+                if _entry_exists(dir_path, present, filename):
+                    results[config_key] = str(dir_path / filename)
                     break
         
         return results
@@ -261,21 +606,30 @@ class FileUtils:
         """
         base_path = Path(base_dir)
         created_paths = {}
+        dir_paths = []
         
-        def create_structure_recursive(parent_path: Path, struct: Dict[str, Any], 
-                                     path_dict: Dict[str, Path]) -> None:
-            for key, value in struct.items():
+        # Depth-first walk with an explicit stack of (parent, remaining items)
+        stack = [(base_path, iter(structure.items()))]
+        while stack:
+            parent_path, items = stack[-1]
+            for key, value in items:
                 if isinstance(value, dict):
                     # Directory
                     dir_path = parent_path / key
-                    dir_path.mkdir(parents=True, exist_ok=True)
-                    path_dict[key] = dir_path
-                    create_structure_recursive(dir_path, value, path_dict)
-                else:
-                    # File or other value
-                    path_dict[key] = parent_path / value
-        
-        create_structure_recursive(base_path, structure, created_paths)
+                    dir_paths.append(dir_path)
+                    created_paths[key] = dir_path
+                    stack.append((dir_path, iter(value.items())))
+                    break
+                # File or other value
+                created_paths[key] = parent_path / value
+            else:
+                stack.pop()
+        
+        # Create all directories in one sweep, shallowest first, so each is a
+        # single mkdir whose parent already exists
+        for dir_path in sorted(dir_paths, key=lambda p: len(p.parts)):
+            _make_dir(dir_path)
+        
         return created_paths
     
     @staticmethod
@@ -294,21 +648,20 @@ class FileUtils:
             Dictionary mapping file names to existence status
         """
         dir_path = Path(directory)
-        if not dir_path.exists():
+        present = _dir_entry_set(dir_path)
+        if present is None:
             return {file: False for file in required_files + (optional_files or [])}
         
         results = {}
         
         # Check required files
         for filename in required_files:
-            file_path = dir_path / filename
-            results[filename] = file_path.exists()
+            results[filename] = _entry_exists(dir_path, present, filename)
         
         # Check optional files
         if optional_files:
             for filename in optional_files:
-                file_path = dir_path / filename
-                results[filename] = file_path.exists()
+                results[filename] = _entry_exists(dir_path, present, filename)
         
         return results
     
@@ -325,32 +678,33 @@ class FileUtils:
         """
         path_obj = Path(file_path)
         
-        if not path_obj.exists():
+        try:
+            st = _try_stat(path_obj)
+        except Exception as e:
             return {
                 'exists': False,
                 'path': str(path_obj),
-                'error': 'File not found'
+                'error': str(e)
             }
         
-        try:
-            stat = path_obj.stat()
-            return {
-                'exists': True,
-                'path': str(path_obj),
-                'size': stat.st_size,
-                'modified': stat.st_mtime,
-                'is_file': path_obj.is_file(),
-                'is_dir': path_obj.is_dir(),
-                'extension': path_obj.suffix,
-                'name': path_obj.name,
-                'parent': str(path_obj.parent)
-            }
-        except Exception as e:
+        if st is None:
             return {
                 'exists': False,
                 'path': str(path_obj),
-                'error': str(e)
+                'error': 'File not found'
             }
+        
+        return {
+            'exists': True,
+            'path': str(path_obj),
+            'size': st.st_size,
+            'modified': st.st_mtime,
+            'is_file': stat.S_ISREG(st.st_mode),
+            'is_dir': stat.S_ISDIR(st.st_mode),
+            'extension': path_obj.suffix,
+            'name': path_obj.name,
+            'parent': str(path_obj.parent)
+        }
 
 
 def main():
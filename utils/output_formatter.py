@@ -5,9 +5,18 @@ Unified output formatting for REST2 enhanced sampling simulations
 """
 
 import sys
-from typing import Dict, List, Any, Optional, Union
+import time
+from typing import Dict, List, Any, Mapping, Optional, Union
 from datetime import datetime
 
+# Minimum time between progress bar redraws (seconds)
+PROGRESS_MIN_INTERVAL = 0.016
+
+# Progress bar width and all of its possible renderings, indexed by filled length
+PROGRESS_BAR_LENGTH = 30
+_PROGRESS_BARS = ['█' * filled + '░' * (PROGRESS_BAR_LENGTH - filled)
+                  for filled in range(PROGRESS_BAR_LENGTH + 1)]
+
 
 class OutputFormatter:
     """
@@ -26,6 +35,31 @@ class OutputFormatter:
         'info': 'ℹ'
     }
     
+    # Last progress bar redraw (time, current), for throttling
+    _progress_last_time = 0.0
+    _progress_last_current = 0
+    
+    @staticmethod
+    def _emit(lines: List[str]) -> None:
+        """
+        Write lines to stdout in a single write call
+        
+        Args:
+            lines: Output lines (without trailing newlines)
+        """
+        sys.stdout.write("\n".join(lines) + "\n")
+    
+    @staticmethod
+    def _header_lines(title: str, style: str = 'header') -> List[str]:
+        """Lines of a formatted header"""
+        rule = OutputFormatter.STYLES[style]
+        return ["", rule, f"{title}", rule]
+    
+    @staticmethod
+    def _subheader_lines(title: str, style: str = 'subheader') -> List[str]:
+        """Lines of a formatted subheader"""
+        return ["", f"{title}", OutputFormatter.STYLES[style]]
+    
     @staticmethod
     def print_header(title: str, style: str = 'header') -> None:
         """
@@ -35,9 +69,7 @@ class OutputFormatter:
             title: Header title
             style: Header style
         """
-        print(f"\n{OutputFormatter.STYLES[style]}")
-        print(f"{title}")
-        print(f"{OutputFormatter.STYLES[style]}")
+        OutputFormatter._emit(OutputFormatter._header_lines(title, style))
     
     @staticmethod
     def print_subheader(title: str, style: str = 'subheader') -> None:
@@ -48,8 +80,7 @@ class OutputFormatter:
             title: Subheader title
             style: Subheader style
         """
-        print(f"\n{title}")
-        print(f"{OutputFormatter.STYLES[style]}")
+        OutputFormatter._emit(OutputFormatter._subheader_lines(title, style))
     
     @staticmethod
     def print_section(title: str, content: Union[str, List[str]], 
@@ -62,43 +93,91 @@ class OutputFormatter:
             content: Section content
             style: Section style
         """
-        print(f"\n{title}")
-        print(f"{OutputFormatter.STYLES[style]}")
+        lines = OutputFormatter._subheader_lines(title, style)
         
         if isinstance(content, str):
-            print(content)
+            lines.append(content)
         elif isinstance(content, list):
-            for item in content:
-                print(f"  {item}")
+            lines.extend(f"  {item}" for item in content)
+        
+        OutputFormatter._emit(lines)
     
     @staticmethod
-    def print_summary(data: Dict[str, Any], title: str = "Summary") -> None:
-        """
-        Print formatted summary
+    def _summary_lines(data: Dict[str, Any], title: str = "Summary") -> List[str]:
+        """Lines of a formatted summary (see print_summary)"""
+        lines = OutputFormatter._subheader_lines(title)
         
-        Args:
-            data: Summary data dictionary
-            title: Summary title
-        """
-        OutputFormatter.print_subheader(title)
+        # Common case: a flat dict of scalars, one "key: value" line each
+        items = list(data.items())
+        if all(not isinstance(value, (list, dict)) for _, value in items):
+            lines += [f"{key:<25}: {value}" for key, value in items]
+            return lines
         
-        for key, value in data.items():
+        for key, value in items:
             if isinstance(value, (int, float)):
-                print(f"{key:<25}: {value}")
+                lines.append(f"{key:<25}: {value}")
             elif isinstance(value, list):
-                print(f"{key:<25}: {len(value)} items")
+                lines.append(f"{key:<25}: {len(value)} items")
                 for i, item in enumerate(value[:5]):  # Show first 5 items
-                    print(f"  {'':<25}  {i}: {item}")
+                    lines.append(f"  {'':<25}  {i}: {item}")
                 if len(value) > 5:
-                    print(f"  {'':<25}  ... and {len(value) - 5} more")
+                    lines.append(f"  {'':<25}  ... and {len(value) - 5} more")
             elif isinstance(value, dict):
-                print(f"{key:<25}: {len(value)} keys")
+                lines.append(f"{key:<25}: {len(value)} keys")
                 for sub_key, sub_value in list(value.items())[:3]:  # Show first 3
-                    print(f"  {'':<25}  {sub_key}: {sub_value}")
+                    lines.append(f"  {'':<25}  {sub_key}: {sub_value}")
                 if len(value) > 3:
-                    print(f"  {'':<25}  ... and {len(value) - 3} more")
+                    lines.append(f"  {'':<25}  ... and {len(value) - 3} more")
             else:
-                print(f"{key:<25}: {value}")
+                lines.append(f"{key:<25}: {value}")
+        
+        return lines
+    
+    @staticmethod
+    def print_summary(data: Dict[str, Any], title: str = "Summary") -> None:
+        """
+        Print formatted summary
+        
+        Args:
+            data: Summary data dictionary
+            title: Summary title
+        """
+        OutputFormatter._emit(OutputFormatter._summary_lines(data, title))
+    
+    @staticmethod
+    def _table_lines(headers: List[str], rows: List[List[Any]], 
+                     title: str = "Table") -> List[str]:
+        """Lines of a formatted table (see print_table); empty if there are no rows"""
+        if not rows:
+            return []
+        
+        lines = OutputFormatter._subheader_lines(title)
+        
+        # Convert cells to strings once (columns beyond the headers are dropped)
+        n_cols = len(headers)
+        str_headers = [str(header) for header in headers]
+        str_rows = [[str(cell) for cell in row[:n_cols]] for row in rows]
+        
+        # Calculate column widths in a single pass over the cells
+        col_widths = [len(header) for header in str_headers]
+        for row in str_rows:
+            for i, cell in enumerate(row):
+                if len(cell) > col_widths[i]:
+                    col_widths[i] = len(cell)
+        
+        # Row formats by number of cells (short rows have fewer columns)
+        row_formats = ["  ".join("{:<%d}" % width for width in col_widths[:n])
+                       for n in range(n_cols + 1)]
+        
+        # Header
+        header_str = row_formats[n_cols].format(*str_headers)
+        lines.append(header_str)
+        lines.append("-" * len(header_str))
+        
+        # Rows
+        lines.extend(row_formats[len(row)].format(*row) for row in str_rows)
+        
+        return lines
     
     @staticmethod
     def print_table(headers: List[str], rows: List[List[Any]], 
@@ -111,29 +190,57 @@ class OutputFormatter:
             rows: Table rows
             title: Table title
         """
-        if not rows:
-            return
+        lines = OutputFormatter._table_lines(headers, rows, title)
+        if lines:
+            OutputFormatter._emit(lines)
+    
+    @staticmethod
+    def _temperature_table_lines(temperatures: List[float], scaling_factors: List[float],
+                                 title: str = "Table") -> List[str]:
+        """
+        Lines of the replica/temperature/lambda table (same layout as _table_lines)
+        
+        The column schema is fixed, so widths come from the extreme values and
+        every row is rendered with one precompiled printf-style template.
+        """
+        n_rows = min(len(temperatures), len(scaling_factors))
+        if n_rows == 0:
+            return []
+        temperatures = temperatures[:n_rows]
+        scaling_factors = scaling_factors[:n_rows]
+        
+        headers = ['Replica', 'Temperature (K)', 'Scaling Factor (λ)']
+        # Formatted length grows with magnitude, so the extremes bound each column
+        widths = [
+            max(len(headers[0]), len(str(n_rows - 1))),
+            max(len(headers[1]), *(len("%.1f" % T) for T in (min(temperatures), max(temperatures)))),
+            max(len(headers[2]), *(len("%.6f" % L) for L in (min(scaling_factors), max(scaling_factors)))),
+        ]
+        fmt = "%%-%dd  %%-%d.1f  %%-%d.6f" % tuple(widths)
+        
+        lines = OutputFormatter._subheader_lines(title)
+        header_str = "%-*s  %-*s  %-*s" % (widths[0], headers[0], widths[1], headers[1],
+                                          widths[2], headers[2])
+        lines.append(header_str)
+        lines.append("-" * len(header_str))
+        lines += [fmt % (i, T, L) for i, (T, L) in enumerate(zip(temperatures, scaling_factors))]
+        
+        return lines
+    
+    @staticmethod
+    def print_temperature_table_fast(temperatures: List[float], scaling_factors: List[float],
+                                     title: str = "Table") -> None:
+        """
+        Print a replica temperature table without the generic print_table path
         
-        OutputFormatter.print_subheader(title)
-        
-        # Calculate column widths
-        col_widths = []
-        for i, header in enumerate(headers):
-            max_width = len(str(header))
-            for row in rows:
-                if i < len(row):
-                    max_width = max(max_width, len(str(row[i])))
-            col_widths.append(max_width)
-        
-        # Print header
-        header_str = "  ".join(f"{header:<{width}}" for header, width in zip(headers, col_widths))
-        print(header_str)
-        print("-" * len(header_str))
-        
-        # Print rows
-        for row in rows:
-            row_str = "  ".join(f"{str(cell):<{width}}" for cell, width in zip(row, col_widths))
-            print(row_str)
+        Args:
+            temperatures: List of temperatures
+            scaling_factors: List of scaling factors
+            title: Table title
+        """
+        lines = OutputFormatter._temperature_table_lines(temperatures, scaling_factors, title)
+        if lines:
+            OutputFormatter._emit(lines)
     
     @staticmethod
     def print_status(message: str, status: str = 'info', indent: int = 0) -> None:
@@ -145,15 +252,19 @@ class OutputFormatter:
             status: Status type ('success', 'error', 'warning', 'info')
             indent: Indentation level
         """
-        icon = OutputFormatter.STYLES.get(status, '')
+        prefix = _STATUS_PREFIX.get(status, ' ')
         indent_str = "  " * indent
-        print(f"{indent_str}{icon} {message}")
+        print(f"{indent_str}{prefix}{message}")
     
     @staticmethod
     def print_progress(current: int, total: int, description: str = "Progress") -> None:
         """
         Print progress bar
         
+        Redraws are throttled to one per PROGRESS_MIN_INTERVAL unless progress
+        advanced by at least 0.5% of total; the first and final steps are
+        always drawn.
+        
         Args:
             current: Current progress
             total: Total steps
@@ -162,10 +273,21 @@ class OutputFormatter:
         if total == 0:
             return
         
+        now = time.monotonic()
+        if (current != total and current != 0
+                and now - OutputFormatter._progress_last_time < PROGRESS_MIN_INTERVAL
+                and current - OutputFormatter._progress_last_current < max(1, total // 200)):
+            return
+        OutputFormatter._progress_last_time = now
+        OutputFormatter._progress_last_current = current
+        
         percentage = (current / total) * 100
-        bar_length = 30
-        filled_length = int(bar_length * current // total)
-        bar = '█' * filled_length + '░' * (bar_length - filled_length)
+        filled_length = int(PROGRESS_BAR_LENGTH * current // total)
+        if 0 <= filled_length <= PROGRESS_BAR_LENGTH:
+            bar = _PROGRESS_BARS[filled_length]
+        else:
+            # Out-of-range progress (current outside 0..total)
+            bar = '█' * filled_length + '░' * (PROGRESS_BAR_LENGTH - filled_length)
         
         print(f"\r{description}: |{bar}| {percentage:.1f}% ({current}/{total})", end='')
         sys.stdout.flush()
@@ -190,14 +312,14 @@ class OutputFormatter:
                 OutputFormatter.print_status(f"  - {error}", 'error', indent=1)
     
     @staticmethod
-    def print_configuration_summary(config: Dict[str, Any]) -> None:
+    def print_configuration_summary(config: Mapping[str, Any]) -> None:
         """
         Print configuration summary
         
         Args:
-            config: Configuration dictionary
+            config: Configuration mapping (read-only mappings are accepted)
         """
-        OutputFormatter.print_header("REST2 Configuration Summary")
+        lines = OutputFormatter._header_lines("REST2 Configuration Summary")
         
         # Basic settings
         basic_settings = {
@@ -210,7 +332,7 @@ class OutputFormatter:
             'Distance cutoff': f"{config.get('distance_range', 0)} Angstrom"
         }
         
-        OutputFormatter.print_summary(basic_settings, "Basic Settings")
+        lines += OutputFormatter._summary_lines(basic_settings, "Basic Settings")
         
         # Selection settings
         selection_settings = {}
@@ -221,7 +343,7 @@ class OutputFormatter:
             selection_settings['Selection method'] = 'Static structure'
         
         if selection_settings:
-            OutputFormatter.print_summary(selection_settings, "Selection Settings")
+            lines += OutputFormatter._summary_lines(selection_settings, "Selection Settings")
         
         # File settings
         file_settings = {
@@ -231,7 +353,8 @@ class OutputFormatter:
             'Output directory': config.get('output_dir', 'Not specified')
         }
         
-        OutputFormatter.print_summary(file_settings, "File Settings")
+        lines += OutputFormatter._summary_lines(file_settings, "File Settings")
+        OutputFormatter._emit(lines)
     
     @staticmethod
     def print_temperature_summary(temperatures: List[float], scaling_factors: List[float],
@@ -244,25 +367,20 @@ class OutputFormatter:
             scaling_factors: List of scaling factors
             method: Scaling method
         """
-        OutputFormatter.print_subheader(f"Temperature Ladder ({method} scaling)")
+        lines = OutputFormatter._subheader_lines(f"Temperature Ladder ({method} scaling)")
         
-        # Create table data
-        headers = ['Replica', 'Temperature (K)', 'Scaling Factor (λ)']
-        rows = []
-        
-        for i, (T, lambda_val) in enumerate(zip(temperatures, scaling_factors)):
-            rows.append([i, f"{T:.1f}", f"{lambda_val:.6f}"])
-        
-        OutputFormatter.print_table(headers, rows)
+        lines += OutputFormatter._temperature_table_lines(temperatures, scaling_factors)
         
         # Print summary info
+        T_lo, T_hi = min(temperatures), max(temperatures)
         summary_data = {
-            'Temperature range': f"{min(temperatures):.1f} - {max(temperatures):.1f} K",
-            'Reference temperature': f"{min(temperatures):.1f} K",
+            'Temperature range': f"{T_lo:.1f} - {T_hi:.1f} K",
+            'Reference temperature': f"{T_lo:.1f} K",
             'Number of replicas': len(temperatures)
         }
         
-        OutputFormatter.print_summary(summary_data, "Temperature Summary")
+        lines += OutputFormatter._summary_lines(summary_data, "Temperature Summary")
+        OutputFormatter._emit(lines)
     
     @staticmethod
     def print_replica_summary(replica_data: Dict[str, Any]) -> None:
@@ -369,6 +487,10 @@ class OutputFormatter:
         OutputFormatter.print_status(f"Output directory: {config.get('output_dir', 'Not specified')}", 'info')
 
 
+# Status message prefixes ("<icon> "), resolved once from the style table
+_STATUS_PREFIX = {status: f"{icon} " for status, icon in OutputFormatter.STYLES.items()}
+
+
 def main():
     """Test output formatter"""
     try:
@@ -5,8 +5,8 @@ Unified temperature ladder and scaling factor calculations for REST2 simulations
 """
 
 import numpy as np
-from typing import List, Tuple, Union
-import math
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 
 class TemperatureCalculationError(Exception):
@@ -14,6 +14,24 @@ class TemperatureCalculationError(Exception):
     pass
 
 
+def _check_params(T_min: float, T_max: float, n_replicas: int,
+                  method: Optional[str] = None) -> None:
+    """
+    Shared temperature parameter checks (method is only checked if given)
+    
+    Raises:
+        TemperatureCalculationError: If parameters are invalid
+    """
+    if T_min <= 0:
+        raise TemperatureCalculationError("T_min must be positive")
+    if T_max <= T_min:
+        raise TemperatureCalculationError("T_max must be greater than T_min")
+    if n_replicas < 1:
+        raise TemperatureCalculationError("n_replicas must be at least 1")
+    if method is not None and method not in ('linear', 'exponential'):
+        raise TemperatureCalculationError(f"Unknown scaling method: {method}")
+
+
 class TemperatureCalculator:
     """
     Unified temperature calculator for REST2 simulations
@@ -22,7 +40,7 @@ class TemperatureCalculator:
     
     @staticmethod
     def calculate_temperature_ladder(T_min: float, T_max: float, n_replicas: int, 
-                                   method: str = 'linear') -> List[float]:
+                                   method: str = 'linear', _validated: bool = False) -> List[float]:
         """
         Calculate temperature ladder for REST2 replicas
         
@@ -31,6 +49,8 @@ class TemperatureCalculator:
             T_max: Maximum temperature (K)
             n_replicas: Number of replicas
             method: Scaling method ('linear' or 'exponential')
+            _validated: Skip the parameter checks (caller already ran
+                validate_temperature_parameters on these values)
             
         Returns:
             List of temperatures for each replica
@@ -39,12 +59,8 @@ class TemperatureCalculator:
             TemperatureCalculationError: If parameters are invalid
         """
         # Validate input parameters
-        if T_min <= 0:
-            raise TemperatureCalculationError("T_min must be positive")
-        if T_max <= T_min:
-            raise TemperatureCalculationError("T_max must be greater than T_min")
-        if n_replicas < 1:
-            raise TemperatureCalculationError("n_replicas must be at least 1")
+        if not _validated:
+            _check_params(T_min, T_max, n_replicas)
         
         # Single replica case
         if n_replicas == 1:
@@ -54,9 +70,8 @@ class TemperatureCalculator:
         if method == 'linear':
             temperatures = np.linspace(T_min, T_max, n_replicas).tolist()
         elif method == 'exponential':
-            # Exponential temperature spacing
-            ratio = (T_max / T_min) ** (1.0 / (n_replicas - 1))
-            temperatures = [T_min * (ratio ** i) for i in range(n_replicas)]
+            # Exponential temperature spacing (constant ratio between neighbours)
+            temperatures = np.geomspace(T_min, T_max, n_replicas).tolist()
         else:
             raise TemperatureCalculationError(f"Unknown scaling method: {method}")
         
@@ -76,17 +91,18 @@ class TemperatureCalculator:
         Raises:
             TemperatureCalculationError: If temperatures are invalid
         """
-        if not temperatures:
+        temps = np.asarray(temperatures, dtype=np.float64)
+        if temps.size == 0:
             raise TemperatureCalculationError("Temperature list cannot be empty")
         
-        if any(T <= 0 for T in temperatures):
+        if (temps <= 0).any():
             raise TemperatureCalculationError("All temperatures must be positive")
         
         # Reference temperature is the lowest temperature
-        T_ref = min(temperatures)
+        T_ref = temps.min()
         
         # Calculate scaling factors
-        scaling_factors = [T_ref / T for T in temperatures]
+        scaling_factors = (T_ref / temps).tolist()
         
         return scaling_factors
     
@@ -105,12 +121,9 @@ class TemperatureCalculator:
         Returns:
             Tuple of (temperatures, scaling_factors)
         """
-        temperatures = TemperatureCalculator.calculate_temperature_ladder(
-            T_min, T_max, n_replicas, method
-        )
-        scaling_factors = TemperatureCalculator.calculate_scaling_factors(temperatures)
+        temperatures, scaling_factors = _compute_ladder_cached(T_min, T_max, n_replicas, method)
         
-        return temperatures, scaling_factors
+        return list(temperatures), list(scaling_factors)
     
     @staticmethod
     def validate_temperature_parameters(T_min: float, T_max: float, n_replicas: int,
@@ -130,19 +143,8 @@ class TemperatureCalculator:
         Raises:
             TemperatureCalculationError: If parameters are invalid
         """
-        # Basic parameter validation
-        if T_min <= 0:
-            raise TemperatureCalculationError("T_min must be positive")
-        if T_max <= T_min:
-            raise TemperatureCalculationError("T_max must be greater than T_min")
-        if n_replicas < 1:
-            raise TemperatureCalculationError("n_replicas must be at least 1")
-        if method not in ['linear', 'exponential']:
-            raise TemperatureCalculationError(f"Unknown scaling method: {method}")
-        
-        # Method-specific validation
-        if method == 'exponential' and T_min <= 0:
-            raise TemperatureCalculationError("T_min must be positive for exponential scaling")
+        # T_min > 0 also covers exponential scaling, so no method-specific checks
+        _check_params(T_min, T_max, n_replicas, method)
         
         return True
     
@@ -157,6 +159,10 @@ class TemperatureCalculator:
             scaling_factors: List of scaling factors
             method: Scaling method used
         """
+        # Callers may pass any list, so scan for the extremes once rather than
+        # relying on the ladder being sorted
+        T_lo, T_hi = min(temperatures), max(temperatures)
+        
         print(f"\nTemperature Ladder ({method} scaling):")
         print("-" * 50)
         print(f"{'Replica':<8} {'Temperature (K)':<15} {'Scaling Factor (λ)':<18}")
@@ -166,11 +172,31 @@ class TemperatureCalculator:
             print(f"{i:<8} {T:<15.1f} {lambda_val:<18.6f}")
         
         print("-" * 50)
-        print(f"Temperature range: {min(temperatures):.1f} - {max(temperatures):.1f} K")
-        print(f"Reference temperature: {min(temperatures):.1f} K")
+        print(f"Temperature range: {T_lo:.1f} - {T_hi:.1f} K")
+        print(f"Reference temperature: {T_lo:.1f} K")
         print()
 
 
+@lru_cache(maxsize=128)
+def _compute_ladder_cached(T_min: float, T_max: float, n_replicas: int,
+                           method: str) -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    """
+    Temperature ladder and scaling factors for one parameter set, memoized
+    
+    Returns immutable tuples so cached results cannot be modified by callers;
+    invalid parameters raise and are not cached. Parameters are checked once:
+    the ladder starts at T_min > 0 and increases, so its temperatures need no
+    second check and T_min is the reference temperature.
+    """
+    _check_params(T_min, T_max, n_replicas)
+    temperatures = TemperatureCalculator.calculate_temperature_ladder(
+        T_min, T_max, n_replicas, method, _validated=True
+    )
+    scaling_factors = temperatures[0] / np.asarray(temperatures, dtype=np.float64)
+    
+    return tuple(temperatures), tuple(scaling_factors.tolist())
+
+
 def main():
     """Test temperature calculator"""
     try:
@@ -6,11 +6,13 @@ Unified validation framework for REST2 enhanced sampling simulations
 
 import os
 import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Mapping, Optional, Union
 
-# Import from same package
-from .temperature_calculator import TemperatureCalculator, TemperatureCalculationError
+# Import from same package (the temperature calculator, which needs NumPy,
+# is imported where it is used)
+from .file_utils import FileUtils
 
 
 class ValidationError(Exception):
@@ -18,6 +20,65 @@ class ValidationError(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class RESTConfig:
+    """
+    Validated configuration parameters, read once from a config mapping
+    
+    Uses explicit __slots__ (dataclass(slots=True) needs Python 3.10), so
+    every field is set by from_mapping rather than by a class default.
+    """
+    __slots__ = ('T_min', 'T_max', 'n_replicas', 'scaling_method', 'replex',
+                 'distance_range', 'occupancy_threshold', 'frame_stride',
+                 'analysis_workers', 'target_selection', 'target_type')
+    
+    T_min: float
+    T_max: float
+    n_replicas: int
+    scaling_method: str
+    replex: int
+    distance_range: float
+    occupancy_threshold: float
+    frame_stride: int
+    analysis_workers: int
+    target_selection: str
+    target_type: str
+    
+    @classmethod
+    def from_mapping(cls, config: Mapping[str, Any]) -> 'RESTConfig':
+        """
+        Read the validated parameters from a config mapping
+        
+        Args:
+            config: Configuration mapping
+            
+        Returns:
+            RESTConfig with defaults for missing keys
+        """
+        return cls(**{key: config.get(key, default) for key, default in _REST_CONFIG_DEFAULTS.items()})
+
+
+def _is_positive_int(value: Any) -> bool:
+    """Whether a config value is an integer of at least 1 (bools excluded)"""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 1
+
+
+# Defaults used when a validated parameter is missing from the config
+_REST_CONFIG_DEFAULTS = {
+    'T_min': 0,
+    'T_max': 0,
+    'n_replicas': 0,
+    'scaling_method': 'linear',
+    'replex': 0,
+    'distance_range': 0,
+    'occupancy_threshold': 0.5,
+    'frame_stride': 1,
+    'analysis_workers': 1,
+    'target_selection': '',
+    'target_type': '',
+}
+
+
 class ValidationFramework:
     """
     Unified validation framework for REST2 simulations
@@ -25,60 +86,56 @@ class ValidationFramework:
     """
     
     @staticmethod
-    def validate_configuration(config: Dict[str, Any]) -> List[str]:
+    def validate_configuration(config: Mapping[str, Any]) -> List[str]:
         """
         Validate configuration parameters
         
         Args:
-            config: Configuration dictionary
+            config: Configuration mapping
             
         Returns:
             List of validation errors (empty if valid)
         """
+        from .temperature_calculator import TemperatureCalculator, TemperatureCalculationError
+        
         errors = []
+        params = RESTConfig.from_mapping(config)
         
         # Validate temperature parameters
-        if TemperatureCalculator:
-            try:
-                TemperatureCalculator.validate_temperature_parameters(
-                    config.get('T_min', 0),
-                    config.get('T_max', 0),
-                    config.get('n_replicas', 0),
-                    config.get('scaling_method', 'linear')
-                )
-            except TemperatureCalculationError as e:
-                errors.append(f"Temperature parameters: {e}")
-        
-        # Validate other parameters
-        if config.get('replex', 0) <= 0:
-            errors.append("replex must be positive")
-        
-        if config.get('distance_range', 0) <= 0:
-            errors.append("distance_range must be positive")
-        
-        occupancy_threshold = config.get('occupancy_threshold', 0.5)
-        if occupancy_threshold < 0 or occupancy_threshold > 1:
-            errors.append("occupancy_threshold must be between 0 and 1")
-        
-        # Validate target selection
-        target_selection = config.get('target_selection', '')
-        if not target_selection:
-            errors.append("target_selection must be specified")
-        
-        # Validate target type
-        target_type = config.get('target_type', '')
-        if target_type not in ['peptide', 'small_molecule']:
-            errors.append("target_type must be 'peptide' or 'small_molecule'")
+        try:
+            TemperatureCalculator.validate_temperature_parameters(
+                params.T_min,
+                params.T_max,
+                params.n_replicas,
+                params.scaling_method
+            )
+        except TemperatureCalculationError as e:
+            errors.append(f"Temperature parameters: {e}")
+        
+        # Validate other parameters, target selection and target type
+        checks = (
+            (params.replex <= 0, "replex must be positive"),
+            (params.distance_range <= 0, "distance_range must be positive"),
+            (params.occupancy_threshold < 0 or params.occupancy_threshold > 1,
+             "occupancy_threshold must be between 0 and 1"),
+            (not _is_positive_int(params.frame_stride), "frame_stride must be a positive integer"),
+            (not _is_positive_int(params.analysis_workers),
+             "analysis_workers must be a positive integer"),
+            (not params.target_selection, "target_selection must be specified"),
+            (params.target_type not in ('peptide', 'small_molecule'),
+             "target_type must be 'peptide' or 'small_molecule'"),
+        )
+        errors.extend(message for failed, message in checks if failed)
         
         return errors
     
     @staticmethod
-    def validate_file_paths(config: Dict[str, Any]) -> List[str]:
+    def validate_file_paths(config: Mapping[str, Any]) -> List[str]:
         """
         Validate file paths in configuration
         
         Args:
-            config: Configuration dictionary
+            config: Configuration mapping
             
         Returns:
             List of validation errors (empty if valid)
@@ -93,15 +150,15 @@ class ValidationFramework:
             if file_path and not Path(file_path).exists():
                 errors.append(f"File not found: {file_path} ({file_key})")
         
-        # Check MD results directory
+        # Check MD results directory (one listing also answers the trajectory check)
         md_dir = Path(config.get('md_results_dir', ''))
-        if not md_dir.exists():
+        md_entries = FileUtils.list_entry_names(md_dir)
+        if md_entries is None:
             errors.append(f"MD results directory not found: {md_dir}")
         
         # Check trajectory file if needed
         if config.get('use_trajectory', False):
-            traj_file = md_dir / 'md.xtc'
-            if not traj_file.exists():
+            if not md_entries or 'md.xtc' not in md_entries:
                 errors.append("Trajectory file (md.xtc) required but not found")
         
         return errors
@@ -190,34 +247,38 @@ class ValidationFramework:
         """
         errors = []
         
-        # Check output directory exists
-        if not output_dir.exists():
+        # Check output directory exists (one listing instead of a stat per replica)
+        replica_names = FileUtils.list_entry_names(output_dir)
+        if replica_names is None:
             errors.append(f"Output directory does not exist: {output_dir}")
             return errors
         
-        # Check all replica directories exist
+        # Check all replica directories exist (paths are plain strings; Path
+        # objects are only built for error messages)
+        base_dir = os.fspath(output_dir)
+        required_files = ['input.tpr', 'topol.top']
         for i in range(n_replicas):
-            replica_dir = output_dir / f"replica_{i}"
-            if not replica_dir.exists():
-                errors.append(f"Replica directory does not exist: {replica_dir}")
+            replica_name = f"replica_{i}"
+            if replica_name not in replica_names:
+                errors.append(f"Replica directory does not exist: {Path(base_dir, replica_name)}")
                 continue
             
             # Check subdirectories
-            input_dir = replica_dir / "input"
-            output_dir_replica = replica_dir / "output"
+            replica_dir = os.path.join(base_dir, replica_name)
+            subdirs = FileUtils.list_entry_names(replica_dir) or set()
             
-            if not input_dir.exists():
-                errors.append(f"Input directory does not exist: {input_dir}")
+            if "input" not in subdirs:
+                errors.append(f"Input directory does not exist: {Path(replica_dir, 'input')}")
             
-            if not output_dir_replica.exists():
-                errors.append(f"Output directory does not exist: {output_dir_replica}")
+            if "output" not in subdirs:
+                errors.append(f"Output directory does not exist: {Path(replica_dir, 'output')}")
             
             # Check required files in input directory
-            required_files = ['input.tpr', 'topol.top']
+            input_dir = os.path.join(replica_dir, "input")
+            input_files = (FileUtils.list_entry_names(input_dir) or set()) if "input" in subdirs else set()
             for filename in required_files:
-                file_path = input_dir / filename
-                if not file_path.exists():
-                    errors.append(f"Required file not found: {file_path}")
+                if filename not in input_files:
+                    errors.append(f"Required file not found: {Path(input_dir, filename)}")
         
         # Check temperature calculations
         if len(temperatures) != n_replicas:
@@ -249,20 +310,20 @@ class ValidationFramework:
         if len(replicas) != n_replicas:
             errors.append(f"Replica count mismatch: {len(replicas)} != {n_replicas}")
         
-        # Check each replica has required files
+        # Check each replica has required files (one listing per input directory)
+        required_files = ['input.tpr', 'topol.top']
         for i, replica in enumerate(replicas):
-            input_dir = Path(replica.get('input_dir', ''))
+            input_dir = os.path.normpath(replica.get('input_dir', ''))
+            input_files = FileUtils.list_entry_names(input_dir)
             
-            if not input_dir.exists():
-                errors.append(f"Replica {i} input directory not found: {input_dir}")
+            if input_files is None:
+                errors.append(f"Replica {i} input directory not found: {Path(input_dir)}")
                 continue
             
             # Check required files
-            required_files = ['input.tpr', 'topol.top']
             for filename in required_files:
-                file_path = input_dir / filename
-                if not file_path.exists():
-                    errors.append(f"Replica {i} missing file: {file_path}")
+                if filename not in input_files:
+                    errors.append(f"Replica {i} missing file: {Path(input_dir, filename)}")
         
         # Validate solute data if provided
         if solute_data:
@@ -274,12 +335,12 @@ class ValidationFramework:
         return errors
     
     @staticmethod
-    def validate_script_generation(config: Dict[str, Any], replica_data: Dict[str, Any]) -> List[str]:
+    def validate_script_generation(config: Mapping[str, Any], replica_data: Dict[str, Any]) -> List[str]:
         """
         Validate script generation setup
         
         Args:
-            config: Configuration dictionary
+            config: Configuration mapping
             replica_data: Replica data dictionary
             
         Returns:
@@ -321,13 +382,13 @@ class ValidationFramework:
                 print(f"  - {error}")
     
     @staticmethod
-    def validate_complete_setup(config: Dict[str, Any], replica_data: Optional[Dict[str, Any]] = None,
+    def validate_complete_setup(config: Mapping[str, Any], replica_data: Optional[Dict[str, Any]] = None,
                               solute_data: Optional[Dict[str, Any]] = None) -> bool:
         """
         Perform complete validation of REST2 setup
         
         Args:
-            config: Configuration dictionary
+            config: Configuration mapping
             replica_data: Replica data dictionary (optional)
             solute_data: Solute data dictionary (optional)
             
@@ -399,13 +460,14 @@ def main():
         ValidationFramework.print_validation_summary(errors, "Configuration validation")
         
         # Test temperature validation
-        if TemperatureCalculator:
-            print("\nTesting temperature validation:")
-            try:
-                TemperatureCalculator.validate_temperature_parameters(300.0, 340.0, 8, 'linear')
-                print("✓ Temperature validation passed")
-            except TemperatureCalculationError as e:
-                print(f"✗ Temperature validation failed: {e}")
+        from .temperature_calculator import TemperatureCalculator, TemperatureCalculationError
+        
+        print("\nTesting temperature validation:")
+        try:
+            TemperatureCalculator.validate_temperature_parameters(300.0, 340.0, 8, 'linear')
+            print("✓ Temperature validation passed")
+        except TemperatureCalculationError as e:
+            print(f"✗ Temperature validation failed: {e}")
         
         # Test complete validation
         print("\nTesting complete validation:")